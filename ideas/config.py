@@ -145,6 +145,9 @@ class Strategy:
     num_patches: decompose domain to enable threads, streams, or multiple GPU's
     num_threads: use a thread pool of this size to drive a multi-patch solver
     gpu_streams: use the per-thread-default-stream, or one stream per grid patch
+    precision:   storage format of solution arrays; arithmetic is always double
+    native_arch: compile CPU kernels for the host's widest SIMD instruction set
+    openmp:      use OpenMP threads in CPU kernels (not with a thread pool)
     """
 
     hardware: Literal["cpu", "gpu"] = "cpu"
@@ -155,6 +158,9 @@ class Strategy:
     num_patches: int = 1
     num_threads: int = 1
     gpu_streams: Literal["per-thread", "per-patch"] = "per-thread"
+    precision: Literal["double", "single"] = "double"
+    native_arch: bool = False
+    openmp: bool = False
 
     @property
     def transpose(self):
@@ -163,6 +169,20 @@ class Strategy:
         """
         return self.data_layout == "fields-first"
 
+    @property
+    def dtype(self):
+        """
+        numpy data type of the solution arrays
+        """
+        return dict(double="float64", single="float32")[self.precision]
+
+    @property
+    def real_type(self):
+        """
+        C type name of the solution arrays, used for the kernel REAL macro
+        """
+        return dict(double="double", single="float")[self.precision]
+
 
 BoundaryConditionType = Literal["outflow", "periodic", "reflecting"]
 Coordinates = Literal["cartesian", "spherical-polar", "cylindrical-polar"]
@@ -258,6 +278,11 @@ class Sailfish:
                 f"curvilinear coordinates only implemented for newtonian hydro"
             )
 
+        if self.strategy.openmp and self.strategy.num_threads > 1:
+            raise ValueError(
+                f"openmp cannot be combined with num_threads > 1 (oversubscribes cores)"
+            )
+
 
 def parse_num_zones(arg):
     """
@@ -417,6 +442,27 @@ def add_config_arguments(parser: "argparser.ArgumentParser"):
         help=Strategy.describe("data_layout"),
         dest="strategy.data_layout",
     )
+    parser.add_argument(
+        "--precision",
+        type=str,
+        choices=Strategy.type_args("precision"),
+        help=Strategy.describe("precision"),
+        dest="strategy.precision",
+    )
+    parser.add_argument(
+        "--native-arch",
+        action="store_true",
+        help=Strategy.describe("native_arch"),
+        dest="strategy.native_arch",
+        default=None,
+    )
+    parser.add_argument(
+        "--openmp",
+        action="store_true",
+        help=Strategy.describe("openmp"),
+        dest="strategy.openmp",
+        default=None,
+    )
     parser.add_argument(
         "--cache-prim",
         action="store_true",
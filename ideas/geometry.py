@@ -1,4 +1,5 @@
 from dataclasses import replace
+from functools import lru_cache
 from schema import schema
 from numpy import array, linspace, meshgrid, sqrt, sin, cos, pi
 from numpy.typing import NDArray
@@ -29,6 +30,31 @@ def subdivide(interval: tuple[int, int], num_parts: int):
         a += n
 
 
+@lru_cache(maxsize=64)
+def cell_vertices_1d(x0: float, x1: float, num_zones: int) -> NDArray[float]:
+    """
+    Return a read-only array of uniformly spaced zone vertices on an interval
+
+    Results are memoized, since the same grids are generated repeatedly, e.g.
+    for initial data, geometry, and forcing on each patch and for each run in
+    a sequence. The array is flagged read-only because it is shared.
+    """
+    xv = linspace(x0, x1, num_zones + 1)
+    xv.flags.writeable = False
+    return xv
+
+
+@lru_cache(maxsize=64)
+def cell_centers_1d(x0: float, x1: float, num_zones: int) -> NDArray[float]:
+    """
+    Return a read-only array of zone centers on an interval; memoized
+    """
+    xv = cell_vertices_1d(x0, x1, num_zones)
+    xc = 0.5 * (xv[1:] + xv[:-1])
+    xc.flags.writeable = False
+    return xc
+
+
 @schema
 class CoordinateBox:
     """
@@ -76,16 +102,14 @@ class CoordinateBox:
             return self.extent_k
 
     def _vertices(self, axis: int, drop_final=False) -> NDArray[float]:
-        nc = self.num_zones[axis]
-        x0, x1 = self.extent(axis)
+        xv = cell_vertices_1d(*self.extent(axis), self.num_zones[axis])
         if drop_final:
-            return linspace(x0, x1, nc + 1)[:-1]
+            return xv[:-1]
         else:
-            return linspace(x0, x1, nc + 1)
+            return xv
 
     def _centers(self, axis: int) -> NDArray[float]:
-        xv = self._vertices(axis)
-        return 0.5 * (xv[1:] + xv[:-1])
+        return cell_centers_1d(*self.extent(axis), self.num_zones[axis])
 
     def cell_centers(self, dim: int = None) -> NDArray[float]:
         """
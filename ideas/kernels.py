@@ -11,7 +11,7 @@ Author: Jonathan Zrake (2022)
 
 # Python standard library imports
 from ctypes import CDLL, POINTER, c_int, c_double, Structure
-from functools import wraps
+from functools import lru_cache, wraps
 from hashlib import sha256
 from os import listdir
 from os.path import join, dirname
@@ -30,6 +30,9 @@ KERNEL_DISABLE_CACHE = False
 KERNEL_DISABLE_CPU_MODE = False
 KERNEL_DISABLE_GPU_MODE = False
 KERNEL_DEFAULT_EXEC_MODE = "cpu"
+KERNEL_CPU_COMPILE_ARGS = ["-std=c99", "-O3"]
+KERNEL_CPU_NATIVE_ARCH = False
+KERNEL_CPU_OPENMP = False
 
 PY_CTYPE_DICT = {
     int: c_int,
@@ -43,15 +46,31 @@ KERNEL_DEFINE_MACROS_CPU = R"""
 #define CPU_MODE
 #define DEVICE static
 #define KERNEL
+#define RESTRICT restrict
+
+#ifndef REAL
+#define REAL double
+#endif
+typedef REAL real;
+
+// When compiled with -fopenmp, the outermost loop is divided among threads.
+#ifdef _OPENMP
+#define PARALLEL_FOR _Pragma("omp parallel for")
+#else
+#define PARALLEL_FOR
+#endif
 
 #define FOR_RANGE_1D(I0, I1) \
+PARALLEL_FOR \
 for (int i = I0; i < I1; ++i) \
 
 #define FOR_RANGE_2D(I0, I1, J0, J1) \
+PARALLEL_FOR \
 for (int i = I0; i < I1; ++i) \
 for (int j = J0; j < J1; ++j) \
 
 #define FOR_RANGE_3D(I0, I1, J0, J1, K0, K1) \
+PARALLEL_FOR \
 for (int i = I0; i < I1; ++i) \
 for (int j = J0; j < J1; ++j) \
 for (int k = K0; k < K1; ++k) \
@@ -66,21 +85,31 @@ KERNEL_DEFINE_MACROS_GPU = R"""
 #define GPU_MODE
 #define DEVICE static __device__
 #define KERNEL extern "C" __global__
+#define RESTRICT __restrict__
+
+#ifndef REAL
+#define REAL double
+#endif
+typedef REAL real;
+
+// The fastest-varying thread index (x) is mapped to the last array axis,
+// which has the smallest memory stride, so that neighboring threads in a
+// warp access neighboring zones. See gpu_extension_function.
 
 #define FOR_RANGE_1D(I0, I1) \
 int i = threadIdx.x + blockIdx.x * blockDim.x; \
 if (i < I0 || i >= I1) return; \
 
 #define FOR_RANGE_2D(I0, I1, J0, J1) \
-int i = threadIdx.x + blockIdx.x * blockDim.x; \
-int j = threadIdx.y + blockIdx.y * blockDim.y; \
+int i = threadIdx.y + blockIdx.y * blockDim.y; \
+int j = threadIdx.x + blockIdx.x * blockDim.x; \
 if (i < I0 || i >= I1 || j < J0 || j >= J1) return; \
 
 #define FOR_RANGE_3D(I0, I1, J0, J1, K0, K1) \
-int i = threadIdx.x + blockIdx.x * blockDim.x; \
+int i = threadIdx.z + blockIdx.z * blockDim.z; \
 int j = threadIdx.y + blockIdx.y * blockDim.y; \
-int k = threadIdx.z + blockIdx.z * blockDim.z; \
-if (i < I0 || i >= I1 || j < J0 || j >= J1 || K < K0 || K >= K1) return; \
+int k = threadIdx.x + blockIdx.x * blockDim.x; \
+if (i < I0 || i >= I1 || j < J0 || j >= J1 || k < K0 || k >= K1) return; \
 
 #define FOR_EACH_1D(NI) FOR_RANGE_1D(0, NI)
 #define FOR_EACH_2D(NI, NJ) FOR_RANGE_2D(0, NI, 0, NJ)
@@ -101,23 +130,33 @@ def perf_time_sequence(mode):
     programs. It yields the number of seconds that have elapsed since the
     previous yield.
 
-    WARNING: it does a device-wide synchronization each time it is called! So,
-    do not call `next` on it in-line with dispatching work to multiple devices
-    or streams.
+    In GPU mode, the time differences are measured with CUDA events recorded
+    on the legacy default stream, so they include all work queued on blocking
+    streams. Each call waits for the host to catch up with the newly recorded
+    event, so do not call `next` on it in-line with dispatching work to
+    multiple devices or streams.
     """
 
     def impl(mode):
-        last = perf_counter()
-        yield
-        while True:
-            if mode == "gpu":
-                from cupy.cuda.runtime import deviceSynchronize
-
-                deviceSynchronize()
-
-            now = perf_counter()
-            yield now - last
-            last = now
+        if mode == "gpu":
+            from cupy.cuda import Event, Stream, get_elapsed_time
+
+            last = Event()
+            last.record(Stream.null)
+            yield
+            while True:
+                now = Event()
+                now.record(Stream.null)
+                now.synchronize()
+                yield get_elapsed_time(last, now) * 1e-3
+                last = now
+        else:
+            last = perf_counter()
+            yield
+            while True:
+                now = perf_counter()
+                yield now - last
+                last = now
 
     g = impl(mode)
     g.send(None)
@@ -130,6 +169,8 @@ def configure_kernel_module(
     disable_cpu_mode=None,
     disable_gpu_mode=None,
     default_exec_mode=None,
+    native_arch=None,
+    openmp=None,
 ):
     """
     Configure the module behavior.
@@ -142,6 +183,8 @@ def configure_kernel_module(
     global KERNEL_DISABLE_CPU_MODE
     global KERNEL_DISABLE_GPU_MODE
     global KERNEL_DEFAULT_EXEC_MODE
+    global KERNEL_CPU_NATIVE_ARCH
+    global KERNEL_CPU_OPENMP
 
     if verbose:
         KERNEL_VERBOSE_COMPILE = True
@@ -155,12 +198,18 @@ def configure_kernel_module(
         if default_exec_mode not in ("cpu", "gpu"):
             raise ValueError("execution mode must be cpu or gpu")
         KERNEL_DEFAULT_EXEC_MODE = default_exec_mode
+    if native_arch is not None:
+        KERNEL_CPU_NATIVE_ARCH = native_arch
+    if openmp is not None:
+        KERNEL_CPU_OPENMP = openmp
 
     logger.debug(f"KERNEL_VERBOSE_COMPILE={KERNEL_VERBOSE_COMPILE}")
     logger.debug(f"KERNEL_DISABLE_CACHE={KERNEL_DISABLE_CACHE}")
     logger.debug(f"KERNEL_DISABLE_CPU_MODE={KERNEL_DISABLE_CPU_MODE}")
     logger.debug(f"KERNEL_DISABLE_GPU_MODE={KERNEL_DISABLE_GPU_MODE}")
     logger.debug(f"KERNEL_DEFAULT_EXEC_MODE={KERNEL_DEFAULT_EXEC_MODE}")
+    logger.debug(f"KERNEL_CPU_NATIVE_ARCH={KERNEL_CPU_NATIVE_ARCH}")
+    logger.debug(f"KERNEL_CPU_OPENMP={KERNEL_CPU_OPENMP}")
 
 
 def argtype(t):
@@ -265,6 +314,21 @@ def cpu_extension(code, name, define_macros=list()):
     a module with the given hash, otherwise it is compiled even if a cached
     version was found.
 
+    Modules are also memoized in-process by their code, name, and define
+    macros, so that kernel classes instantiated more than once (e.g. for each
+    run in a sequence of runs) do not re-hash and re-load the build product.
+
+    Compiler flags are taken from the module variable
+    `KERNEL_CPU_COMPILE_ARGS`, which enables optimization levels where the
+    inner loops over fields are auto-vectorized. If `KERNEL_CPU_NATIVE_ARCH`
+    is `True` then code is also generated for the host's widest SIMD
+    instruction set. If `KERNEL_CPU_OPENMP` is `True` then the module is
+    compiled and linked with OpenMP, and the for-each loops in CPU kernels
+    are run on multiple threads (the thread count is set by the usual
+    OMP_NUM_THREADS environment variable). This is an alternative to a
+    multi-patch solver driven by a thread pool; using both at once will
+    oversubscribe the cores. The flags are part of the build product hash.
+
     This method can fail with a `ValueError` if the compilation fails. The
     compiler's stderr should be written to the terminal to aid in identifying
     the compilation error.
@@ -273,6 +337,24 @@ def cpu_extension(code, name, define_macros=list()):
         logger.debug(f"KERNEL_DISABLE_CPU_MODE=True; skip CPU extension")
         return MissingModule(RuntimeError("invoke skipped CPU extension"))
 
+    compile_args = list(KERNEL_CPU_COMPILE_ARGS)
+
+    if KERNEL_CPU_NATIVE_ARCH:
+        compile_args.append("-march=native")
+
+    if KERNEL_CPU_OPENMP:
+        compile_args.append("-fopenmp")
+
+    args = (code, name, tuple(define_macros), tuple(compile_args))
+
+    if KERNEL_DISABLE_CACHE:
+        return _cpu_extension.__wrapped__(*args)
+    else:
+        return _cpu_extension(*args)
+
+
+@lru_cache(maxsize=None)
+def _cpu_extension(code, name, define_macros, compile_args):
     # Add header macros with for-each loops, etc.
     code = KERNEL_DEFINE_MACROS_CPU + code
     verbose = KERNEL_VERBOSE_COMPILE
@@ -281,7 +363,8 @@ def cpu_extension(code, name, define_macros=list()):
     # build product.
     sha = sha256()
     sha.update(code.encode("utf-8"))
-    sha.update(str(define_macros).encode("utf-8"))
+    sha.update(str(list(define_macros)).encode("utf-8"))
+    sha.update(str(list(compile_args)).encode("utf-8"))
     cache_dir = join(dirname(__file__), "__pycache__", sha.hexdigest())
     define_str = define_macros_string(define_macros)
 
@@ -318,8 +401,9 @@ def cpu_extension(code, name, define_macros=list()):
         ffi.set_source(
             name,
             code,
-            define_macros=define_macros,
-            extra_compile_args=["-std=c99"],
+            define_macros=list(define_macros),
+            extra_compile_args=list(compile_args),
+            extra_link_args=["-fopenmp"] if "-fopenmp" in compile_args else [],
         )
         target = ffi.compile(tmpdir=cache_dir or ".", verbose=verbose)
         module = CDLL(target)
@@ -332,10 +416,25 @@ def cpu_extension(code, name, define_macros=list()):
 
 
 def gpu_extension(code, name, define_macros=list()):
+    """
+    Build a GPU extension module with the given code and name.
+
+    Compiled modules are memoized in-process by their code, name, and define
+    macros, unless the module variable `KERNEL_DISABLE_CACHE` is `True`.
+    Across processes, the CUDA binaries are cached on disk by cupy.
+    """
     if KERNEL_DISABLE_GPU_MODE:
         logger.debug(f"KERNEL_DISABLE_GPU_MODE=True; skip GPU extension")
         return MissingModule(RuntimeError("invoke skipped GPU extension"))
 
+    if KERNEL_DISABLE_CACHE:
+        return _gpu_extension.__wrapped__(code, name, tuple(define_macros))
+    else:
+        return _gpu_extension(code, name, tuple(define_macros))
+
+
+@lru_cache(maxsize=None)
+def _gpu_extension(code, name, define_macros):
     try:
         from cupy import RawModule
         from cupy.cuda.compiler import CompileException
@@ -411,7 +510,10 @@ def gpu_extension_function(module, stub):
             ni, nj, nk = shape
             nb = ((ni + ti - 1) // ti, (nj + tj - 1) // tj, (nk + tk - 1) // tk)
 
-        gpu_func(nb, bs, tuple(to_gpu_args(pyargs)))
+        # The grid and block dimensions are given in (x, y, z) order, where
+        # the x index is mapped to the last array axis by the FOR_RANGE
+        # macros, so they are reversed from the (i, j, k) ordering.
+        gpu_func(nb[::-1], bs[::-1], tuple(to_gpu_args(pyargs)))
 
     wrapper.__gpu_func__ = gpu_func
     return wrapper
@@ -838,7 +940,7 @@ def main():
                 raise ValueError("p.shape[-1] must be 5")
             if p.shape != u.shape:
                 raise ValueError("p and u must have the same shape")
-            return (p.size // 5,), (u, p, p.size // 5)
+            return p.shape[:1], (u, p, p.shape[0])
 
         @kernel(device_funcs=[dot3])
         def primitive_to_conserved(
@@ -874,7 +976,7 @@ def main():
                 raise ValueError("u.shape[-1] must be 5")
             if u.shape != p.shape:
                 raise ValueError("u and p must have the same shape")
-            return (u.size // 5,), (p, u, u.size // 5)
+            return u.shape[:1], (p, u, u.shape[0])
 
     solver = Solver()
     p = array([[1.0, 0.0, 0.0, 0.0, 1.0], [1.0, 0.0, 0.0, 0.0, 1.0]])
@@ -447,7 +447,7 @@ if __name__ == "__main__":
             }
         }
         """
-        return u.size // nprim, (u, p, u.size // nprim)
+        return u.shape[0], (u, p, u.shape[0])
 
     @kernel(device_funcs=[prim_to_cons], define_macros=dict(NPRIM=nprim))
     def kernel_prim_to_cons(p: NDArray[float], u: NDArray[float], ni: int = None):
@@ -460,7 +460,7 @@ if __name__ == "__main__":
             }
         }
         """
-        return p.size // nprim, (p, u, p.size // nprim)
+        return p.shape[0], (p, u, p.shape[0])
 
     p = array([[1.0, 0.1, 0.2, 100.0]])
     u = zeros_like(p)
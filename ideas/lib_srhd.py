@@ -3,8 +3,8 @@ from kernels import device
 
 
 static = R"""
-#define min2(a, b) ((a) < (b) ? (a) : (b))
-#define max2(a, b) ((a) > (b) ? (a) : (b))
+#define min2(a, b) fmin(a, b)
+#define max2(a, b) fmax(a, b)
 #define min3(a, b, c) min2(a, min2(b, c))
 #define max3(a, b, c) max2(a, max2(b, c))
 
@@ -48,20 +48,23 @@ static = R"""
 #ifndef GAMMA_LAW_INDEX
 #define GAMMA_LAW_INDEX (5.0 / 3.0)
 #endif
+
+// Enthalpy coefficient, rho h = rho + pre * gamma / (gamma - 1)
+#define GAMMA_EFF_COEFF (GAMMA_LAW_INDEX / (GAMMA_LAW_INDEX - 1.0))
 """
 
 
 @device(static=static)
 def prim_to_cons(p: NDArray[float], u: NDArray[float]):
     R"""
-    DEVICE void prim_to_cons(double *p, double *u)
+    DEVICE void prim_to_cons(double *RESTRICT p, double *RESTRICT u)
     {
         #if NVECS == 1
         double rho = p[RHO];
         double gbx = p[UXX];
         double pre = p[PRE];
         double w =  sqrt(1.0 + gbx * gbx);
-        double h = 1.0 + pre / rho * (1.0 + 1.0 / (GAMMA_LAW_INDEX - 1.0));
+        double h = 1.0 + pre / rho * GAMMA_EFF_COEFF;
         double m = rho * w;
         u[DEN] = m;
         u[SXX] = m * h * gbx;
@@ -73,7 +76,7 @@ def prim_to_cons(p: NDArray[float], u: NDArray[float]):
         double gby = p[UYY];
         double pre = p[PRE];
         double w =  sqrt(1.0 + gbx * gbx + gby * gby);
-        double h = 1.0 + pre / rho * (1.0 + 1.0 / (GAMMA_LAW_INDEX - 1.0));
+        double h = 1.0 + pre / rho * GAMMA_EFF_COEFF;
         double m = rho * w;
         u[DEN] = m;
         u[SXX] = m * h * gbx;
@@ -87,7 +90,7 @@ def prim_to_cons(p: NDArray[float], u: NDArray[float]):
         double gbz = p[UZZ];
         double pre = p[PRE];
         double w =  sqrt(1.0 + gbx * gbx + gby * gby + gbz * gbz);
-        double h = 1.0 + pre / rho * (1.0 + 1.0 / (GAMMA_LAW_INDEX - 1.0));
+        double h = 1.0 + pre / rho * GAMMA_EFF_COEFF;
         double m = rho * w;
         u[DEN] = m;
         u[SXX] = m * h * gbx;
@@ -100,19 +103,25 @@ def prim_to_cons(p: NDArray[float], u: NDArray[float]):
 
 
 @device(static=static)
-def cons_to_prim(u: NDArray[float], p: NDArray[float]):
+def cons_to_prim(u: NDArray[float], p: NDArray[float]) -> int:
     R"""
-    DEVICE void cons_to_prim(double *u, double *p)
+    DEVICE int cons_to_prim(double *RESTRICT u, double *RESTRICT p)
     {
+        // Newton-Raphson iteration on Z = rho h W^2 = tau + D + p, starting
+        // from the lower bound Z = tau + D. The residual f(Z) = Z - p(Z) - E
+        // is smooth and monotone in Z, so the iteration does not depend on
+        // the previous pressure and converges in a handful of steps. Returns
+        // zero on success and one if the iteration budget is exhausted.
+        int newton_iter_max = 8;
         int iteration = 0;
-        int newton_iter_max = 50;
+        int converged = 0;
 
         double gm = GAMMA_LAW_INDEX;
+        double k = (gm - 1.0) / gm;
         double m = u[DEN];
-        double tau = u[NRG];
-        double pre = p[PRE];
-        double error_tolerance = 1e-12;// * (m + tau);
-        double w0;
+        double e = u[NRG] + m;
+        double error_tolerance = 1e-12;
+        double z = e;
 
         #if NVECS == 1
         double ss = u[SXX] * u[SXX];
@@ -122,46 +131,42 @@ def cons_to_prim(u: NDArray[float], p: NDArray[float]):
         double ss = u[SXX] * u[SXX] + u[SYY] * u[SYY] + u[SZZ] * u[SZZ];
         #endif
 
-        while (1)
+        while (iteration < newton_iter_max)
         {
-            double et  = tau + pre + m;
-            double b2  = min2(ss / et / et, 1.0 - 1e-10);
-            double w2  = 1.0 / (1.0 - b2);
-            double w   = sqrt(w2);
-            double e   = (tau + m * (1.0 - w) + pre * (1.0 - w2)) / (m * w);
-            double rho = m / w;
-            double h   = 1.0 + e + pre / rho;
-            double a2  = gm * pre / (rho * h);
-            double f   = rho * e * (gm - 1.0) - pre;
-            double g   = b2 * a2 - 1.0;
-
-            pre -= f / g;
-
-            if (fabs(f) < error_tolerance)
+            double v2  = min2(ss / (z * z), 1.0 - 1e-10);
+            double w   = 1.0 / sqrt(1.0 - v2);
+            double pre = k * (z / (w * w) - m / w);
+            double f   = z - pre - e;
+            double g   = 1.0 - k * (1.0 + v2 - m * v2 * w / z);
+            double dz  = f / g;
+
+            z -= dz;
+            iteration += 1;
+
+            if (fabs(dz) < error_tolerance * z)
             {
-                w0 = w;
+                converged = 1;
                 break;
             }
-            if (iteration == newton_iter_max)
-            {
-                printf("c2p failed: %f %f %f\n", u[0], u[1], u[2]);
-                exit(1);
-            }
-            iteration += 1;
         }
 
+        double v2 = min2(ss / (z * z), 1.0 - 1e-10);
+        double w0 = 1.0 / sqrt(1.0 - v2);
+
         p[RHO] = m / w0;
-        p[PRE] = pre;
+        p[PRE] = k * (z / (w0 * w0) - m / w0);
 
         #if NVECS >= 1
-        p[UXX] = w0 * u[1] / (tau + m + pre);
+        p[UXX] = w0 * u[SXX] / z;
         #endif
         #if NVECS >= 2
-        p[UYY] = w0 * u[2] / (tau + m + pre);
+        p[UYY] = w0 * u[SYY] / z;
         #endif
         #if NVECS >= 3
-        p[UZZ] = w0 * u[3] / (tau + m + pre);
+        p[UZZ] = w0 * u[SZZ] / z;
         #endif
+
+        return !converged;
     }
     """
 
@@ -169,9 +174,9 @@ def cons_to_prim(u: NDArray[float], p: NDArray[float]):
 @device(static=static, device_funcs=[cons_to_prim])
 def cons_to_prim_check(u: NDArray[float], p: NDArray[float]) -> int:
     R"""
-    DEVICE int cons_to_prim_check(double *u, double *p)
+    DEVICE int cons_to_prim_check(double *RESTRICT u, double *RESTRICT p)
     {
-        cons_to_prim(u, p);
+        int error = cons_to_prim(u, p);
 
         if (u[DEN] < 0.0) {
             return 1;
@@ -182,6 +187,9 @@ def cons_to_prim_check(u: NDArray[float], p: NDArray[float]) -> int:
         if (p[PRE] < 0.0) {
             return 3;
         }
+        if (error) {
+            return 4;
+        }
         return 0;
     }
     """
@@ -195,48 +203,33 @@ def prim_and_cons_to_flux(
     direction: int,
 ):
     R"""
-    DEVICE void prim_and_cons_to_flux(double *p, double *u, double *f, int direction)
+    DEVICE void prim_and_cons_to_flux(
+        double *RESTRICT p,
+        double *RESTRICT u,
+        double *RESTRICT f,
+        int direction)
     {
-        #if NVECS == 1
-        double gbx = p[UXX];
-        double gby = 0.0;
-        double gbz = 0.0;
-        double uu = gbx * gbx;
-        #elif NVECS == 2
-        double gbx = p[UXX];
-        double gby = p[UYY];
-        double gbz = 0.0;
-        double uu = gbx * gbx + gby * gby;
-        #elif NVECS == 3
-        double gbx = p[UXX];
-        double gby = p[UYY];
-        double gbz = p[UZZ];
-        double uu = gbx * gbx + gby * gby + gbz * gbz;
-        #endif
-
-        double pre = p[PRE];
-        double vn = 0.0;
-        double w = sqrt(1.0 + uu);
+        // The direction (1, 2, or 3) must not exceed NVECS; it selects the
+        // normal component by index rather than by branching.
+        double uu = 0.0;
 
-        switch (direction)
+        for (int d = 0; d < NVECS; ++d)
         {
-            case 1: vn = gbx / w; break;
-            case 2: vn = gby / w; break;
-            case 3: vn = gbz / w; break;
+            uu += p[UXX + d] * p[UXX + d];
         }
 
+        double pre = p[PRE];
+        double w = sqrt(1.0 + uu);
+        double vn = p[UXX + direction - 1] / w;
+
         f[DEN] = vn * u[DEN];
         f[NRG] = vn * u[NRG] + pre * vn;
 
-        #if NVECS >= 1
-        f[SXX] = vn * u[SXX] + pre * (direction == 1);
-        #endif
-        #if NVECS >= 2
-        f[SYY] = vn * u[SYY] + pre * (direction == 2);
-        #endif
-        #if NVECS >= 3
-        f[SZZ] = vn * u[SZZ] + pre * (direction == 3);
-        #endif
+        for (int d = 0; d < NVECS; ++d)
+        {
+            f[SXX + d] = vn * u[SXX + d];
+        }
+        f[SXX + direction - 1] += pre;
     }
     """
 
@@ -260,7 +253,7 @@ def sound_speed_squared(p: NDArray[float]) -> float:
     {
         double rho = p[DEN];
         double pre = p[PRE];
-        double rhoh = rho + pre * (1.0 + 1.0 / (GAMMA_LAW_INDEX - 1.0));
+        double rhoh = rho + pre * GAMMA_EFF_COEFF;
         return pre / rhoh * GAMMA_LAW_INDEX;
     }
     """
@@ -274,37 +267,22 @@ def outer_wavespeeds(
 ):
     R"""
     DEVICE void outer_wavespeeds(
-        double *p,
-        double *wavespeeds,
+        double *RESTRICT p,
+        double *RESTRICT wavespeeds,
         int direction)
     {
-        #if NVECS == 1
-        double gbx = p[UXX];
-        double gby = 0.0;
-        double gbz = 0.0;
-        double uu = gbx * gbx;
-        #elif NVECS == 2
-        double gbx = p[UXX];
-        double gby = p[UYY];
-        double gbz = 0.0;
-        double uu = gbx * gbx + gby * gby;
-        #elif NVECS == 3
-        double gbx = p[UXX];
-        double gby = p[UYY];
-        double gbz = p[UZZ];
-        double uu = gbx * gbx + gby * gby + gbz * gbz;
-        #endif
+        // The direction (1, 2, or 3) must not exceed NVECS; it selects the
+        // normal component by index rather than by branching.
+        double uu = 0.0;
 
-        double w = sqrt(1.0 + uu);
-        double vn = 0.0;
-        double a2 = sound_speed_squared(p);
-
-        switch (direction)
+        for (int d = 0; d < NVECS; ++d)
         {
-            case 1: vn = gbx / w; break;
-            case 2: vn = gby / w; break;
-            case 3: vn = gbz / w; break;
+            uu += p[UXX + d] * p[UXX + d];
         }
+
+        double w = sqrt(1.0 + uu);
+        double vn = p[UXX + direction - 1] / w;
+        double a2 = sound_speed_squared(p);
         double vv = uu / (1.0 + uu);
         double v2 = vn * vn;
         double k0 = sqrt(a2 * (1.0 - vv) * (1.0 - vv * a2 - v2 * (1.0 - a2)));
@@ -366,7 +344,11 @@ def riemann_hlle(
     direction: int,
 ):
     R"""
-    DEVICE void riemann_hlle(double *pl, double *pr, double *flux, int direction)
+    DEVICE void riemann_hlle(
+        double *pl,
+        double *pr,
+        double *RESTRICT flux,
+        int direction)
     {
         double ul[NCONS];
         double ur[NCONS];
@@ -393,6 +375,104 @@ def riemann_hlle(
     """
 
 
+@device(
+    static=static,
+    device_funcs=[
+        prim_to_cons,
+        prim_and_cons_to_flux,
+        outer_wavespeeds,
+    ],
+)
+def riemann_hllc(
+    pl: NDArray[float],
+    pr: NDArray[float],
+    flux: NDArray[float],
+    direction: int,
+):
+    R"""
+    DEVICE void riemann_hllc(
+        double *pl,
+        double *pr,
+        double *RESTRICT flux,
+        int direction)
+    {
+        // Relativistic HLLC solver of Mignone & Bodo (2005). The contact speed
+        // a_star is the smaller root of the quadratic (their eq. 18), written
+        // in a form which stays finite when the HLL energy flux vanishes. The
+        // star states are their eqs. (16); E = tau + D is the total energy.
+        double ul[NCONS];
+        double ur[NCONS];
+        double fl[NCONS];
+        double fr[NCONS];
+        double al[2];
+        double ar[2];
+
+        prim_to_cons(pl, ul);
+        prim_to_cons(pr, ur);
+        prim_and_cons_to_flux(pl, ul, fl, direction);
+        prim_and_cons_to_flux(pr, ur, fr, direction);
+        outer_wavespeeds(pl, al, direction);
+        outer_wavespeeds(pr, ar, direction);
+
+        double am = min2(al[0], ar[0]);
+        double ap = max2(al[1], ar[1]);
+
+        if (am >= 0.0)
+        {
+            for (int q = 0; q < NCONS; ++q)
+            {
+                flux[q] = fl[q];
+            }
+        }
+        else if (ap <= 0.0)
+        {
+            for (int q = 0; q < NCONS; ++q)
+            {
+                flux[q] = fr[q];
+            }
+        }
+        else
+        {
+            int sn = SXX + direction - 1;
+            double da = 1.0 / (ap - am);
+            double el = ul[NRG] + ul[DEN];
+            double er = ur[NRG] + ur[DEN];
+            double fel = fl[NRG] + fl[DEN];
+            double fer = fr[NRG] + fr[DEN];
+            double e_hll = (ap * er - am * el + fel - fer) * da;
+            double s_hll = (ap * ur[sn] - am * ul[sn] + fl[sn] - fr[sn]) * da;
+            double fe_hll = (ap * fel - am * fer + ap * am * (er - el)) * da;
+            double fs_hll = (ap * fl[sn] - am * fr[sn] + ap * am * (ur[sn] - ul[sn])) * da;
+            double b = e_hll + fs_hll;
+            double a_star = 2.0 * s_hll / (b + sqrt(b * b - 4.0 * fe_hll * s_hll));
+            double p_star = fs_hll - fe_hll * a_star;
+
+            double *pk = a_star >= 0.0 ? pl : pr;
+            double *uk = a_star >= 0.0 ? ul : ur;
+            double *fk = a_star >= 0.0 ? fl : fr;
+            double ak = a_star >= 0.0 ? am : ap;
+            double vk = fk[DEN] / uk[DEN];
+            double ek = uk[NRG] + uk[DEN];
+            double sk = (ak - vk) / (ak - a_star);
+            double e_star = (ek * (ak - vk) + p_star * a_star - pk[PRE] * vk) / (ak - a_star);
+            double u_star[NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                u_star[q] = uk[q] * sk;
+            }
+            u_star[sn] = (e_star + p_star) * a_star;
+            u_star[NRG] = e_star - u_star[DEN];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                flux[q] = fk[q] + ak * (u_star[q] - uk[q]);
+            }
+        }
+    }
+    """
+
+
 if __name__ == "__main__":
     from numpy import array, zeros_like, allclose
     from kernels import kernel
@@ -410,7 +490,7 @@ if __name__ == "__main__":
             }
         }
         """
-        return u.size // nprim, (u, p, u.size // nprim)
+        return u.shape[0], (u, p, u.shape[0])
 
     @kernel(device_funcs=[prim_to_cons], define_macros=dict(NPRIM=nprim))
     def kernel_prim_to_cons(p: NDArray[float], u: NDArray[float], ni: int = None):
@@ -423,7 +503,7 @@ if __name__ == "__main__":
             }
         }
         """
-        return p.size // nprim, (p, u, p.size // nprim)
+        return p.shape[0], (p, u, p.shape[0])
 
     if nprim == 3:
         p = array([[1.0, 5.0, 0.01]])
@@ -12,18 +12,14 @@ discriminating field.
 
 
 from typing import Literal, Union
-from numpy import logical_not, zeros, sqrt, sin, cos, pi
+from numpy import array, where, zeros, sqrt, sin, cos, pi
 from preset import preset
 from schema import schema
 from geometry import CoordinateBox
 
 
 def two_state(region_a, state_a, state_b):
-    region_b = logical_not(region_a)
-    p = zeros(region_a.shape + (len(state_a),))
-    p[region_a] = state_a
-    p[region_b] = state_b
-    return p
+    return where(region_a[..., None], array(state_a, float), array(state_b, float))
 
 
 @schema
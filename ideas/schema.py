@@ -135,6 +135,7 @@ def configmodel_rich_table(d, console, options):
 
 
 def schema(cls):
+    from functools import lru_cache
     from pydantic.dataclasses import dataclass
     from pydantic import Extra
 
@@ -158,9 +159,11 @@ def schema(cls):
     for key, description in field_descriptions.items():
         fields[key].metadata = dict(description=description)
 
+    @lru_cache(maxsize=None)
     def describe(self, key):
         return self.__dataclass_fields__[key].metadata.get("description", None)
 
+    @lru_cache(maxsize=None)
     def type_args(self, key):
         return self.__dataclass_fields__[key].type.__args__
 
@@ -3,6 +3,7 @@ Multi-dimensional 2nd order Godunov solver using the method of lines
 """
 
 from contextlib import nullcontext
+from functools import partial
 from logging import getLogger
 from math import prod
 from multiprocessing.pool import ThreadPool
@@ -26,21 +27,27 @@ from index_space import IndexSpace
 @device
 def plm_minmod(yl: float, yc: float, yr: float, plm_theta: float):
     R"""
-    #define min2(a, b) ((a) < (b) ? (a) : (b))
-    #define min3(a, b, c) min2(a, min2(b, c))
-    #define sign(x) copysign(1.0, x)
-    #define minabs(a, b, c) min3(fabs(a), fabs(b), fabs(c))
-
     DEVICE double plm_minmod(
         double yl,
         double yc,
         double yr,
         double plm_theta)
     {
+        // The result is the smallest of the three slopes in magnitude if
+        // they all have the same sign, and zero otherwise. The selection is
+        // a multiplication by the sign-agreement bit rather than a branch.
         double a = (yc - yl) * plm_theta;
         double b = (yr - yl) * 0.5;
         double c = (yr - yc) * plm_theta;
-        return 0.25 * fabs(sign(a) + sign(b)) * (sign(a) + sign(c)) * minabs(a, b, c);
+        double fa = fabs(a);
+        double fb = fabs(b);
+        double fc = fabs(c);
+        double m = fa < fb ? fa : fb;
+        m = m < fc ? m : fc;
+        int sa = signbit(a) != 0;
+        int sb = signbit(b) != 0;
+        int sc = signbit(c) != 0;
+        return copysign(m, a) * ((sa == sb) & (sa == sc));
     }
     """
 
@@ -55,6 +62,7 @@ class GradientEstimation:
         self._dim = config.domain.dimensionality
         self._nfields = len(config.initial_data.primitive_fields)
         self._transpose = config.strategy.transpose
+        self._real_type = config.strategy.real_type
         self._plm_theta = (
             config.scheme.reconstruction[1]
             if type(config.scheme.reconstruction) is tuple
@@ -67,6 +75,8 @@ class GradientEstimation:
             NFIELDS=self._nfields,
             DIM=self._dim,
             TRANSPOSE=int(self._transpose),
+            REAL=self._real_type,
+            PLM_THETA=self._plm_theta,
         )
 
     @property
@@ -78,13 +88,17 @@ class GradientEstimation:
         self,
         y: NDArray[float],
         g: NDArray[float],
-        plm_theta: float = None,
         ni: int = None,
         nj: int = None,
         nk: int = None,
     ):
         R"""
-        KERNEL void plm_gradient(double *y, double *g, double plm_theta, int ni, int nj, int nk)
+        KERNEL void plm_gradient(
+            real *RESTRICT y,
+            real *RESTRICT g,
+            int ni,
+            int nj,
+            int nk)
         {
             int nq = NFIELDS;
             int nd = ni * nj * nk * nq;
@@ -154,7 +168,7 @@ class GradientEstimation:
                         double yc = y[nccc + q * sq];
                         double yl = y[nlcc + q * sq];
                         double yr = y[nrcc + q * sq];
-                        g[0 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, plm_theta);
+                        g[0 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, PLM_THETA);
                     }
                     #endif
                     #if DIM >= 2
@@ -162,7 +176,7 @@ class GradientEstimation:
                         double yc = y[nccc + q * sq];
                         double yl = y[nclc + q * sq];
                         double yr = y[ncrc + q * sq];
-                        g[1 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, plm_theta);
+                        g[1 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, PLM_THETA);
                     }
                     #endif
                     #if DIM >= 3
@@ -170,17 +184,24 @@ class GradientEstimation:
                         double yc = y[nccc + q * sq];
                         double yl = y[nccl + q * sq];
                         double yr = y[nccr + q * sq];
-                        g[2 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, plm_theta);
+                        g[2 * nd + nccc + q * sq] = plm_minmod(yl, yc, yr, PLM_THETA);
                     }
                     #endif
                 }
             }
         }
         """
-        plm = plm_theta if plm_theta is not None else self._plm_theta
         dim = self._dim
         s = y.shape[:3]
-        return s[:dim], (y, g, plm, *s)
+        return s[:dim], (y, g, *s)
+
+
+C2P_ERRORS = {
+    1: "found negative density",
+    2: "found negative energy",
+    3: "found negative pressure",
+    4: "reached max iteration",
+}
 
 
 @kernel_class
@@ -192,7 +213,12 @@ class Fields:
     functions which can operate either in fields-last or fields-first
     (struct-of-arrays, or transposed) data layout. These functions treat the
     input and output arrays as flattened, so they work for any domain
-    dimensionality. The dim parameter is used to infer the number of fields.
+    dimensionality. The number of zones is the product of the logical array
+    shape, excluding the fields axis, which is last in either layout.
+
+    Kernels which recover primitives write a nonzero status code (see
+    C2P_ERRORS) to the s array in zones where the recovery failed, and leave
+    the other zones alone.
     """
 
     def __init__(self, config: Sailfish):
@@ -203,6 +229,7 @@ class Fields:
         self.dim = config.domain.dimensionality
         self.nprim = len(config.initial_data.primitive_fields)
         self.transpose = config.strategy.transpose
+        self.real_type = config.strategy.real_type
         self.gamma_law_index = config.physics.equation_of_state.gamma_law_index
 
     @property
@@ -212,6 +239,7 @@ class Fields:
             NPRIM=self.nprim,
             TRANSPOSE=int(self.transpose),
             GAMMA_LAW_INDEX=self.gamma_law_index,
+            REAL=self.real_type,
         )
 
     @property
@@ -219,6 +247,7 @@ class Fields:
         return [
             self.hydro_lib.prim_to_cons,
             self.hydro_lib.cons_to_prim,
+            self.hydro_lib.cons_to_prim_check,
             self.hydro_lib.max_wavespeed,
         ]
 
@@ -227,10 +256,11 @@ class Fields:
         self,
         u: NDArray[float],
         p: NDArray[float],
+        s: NDArray[int],
         ni: int = None,
     ):
         R"""
-        KERNEL void cons_to_prim_array(double *u, double *p, int ni)
+        KERNEL void cons_to_prim_array(real *RESTRICT u, real *RESTRICT p, int *RESTRICT s, int ni)
         {
             #if TRANSPOSE == 0
             int sq = 1;
@@ -249,18 +279,21 @@ class Fields:
                 {
                     u_reg[q] = u[i * si + q * sq];
                 }
-                cons_to_prim(u_reg, p_reg);
+                int status = cons_to_prim_check(u_reg, p_reg);
 
                 for (int q = 0; q < NCONS; ++q)
                 {
                     p[i * si + q * sq] = p_reg[q];
                 }
+                if (status)
+                {
+                    s[i] = status;
+                }
             }
         }
         """
-        nq = self.nprim
-        iq = 0 if self.transpose else -1
-        return u.size // nq, (u, p, u.size // nq)
+        ni = prod(u.shape[:-1])
+        return ni, (u, p, s, ni)
 
     @kernel
     def prim_to_cons_array(
@@ -270,7 +303,7 @@ class Fields:
         ni: int = None,
     ):
         R"""
-        KERNEL void prim_to_cons_array(double *p, double *u, int ni)
+        KERNEL void prim_to_cons_array(real *RESTRICT p, real *RESTRICT u, int ni)
         {
             #if TRANSPOSE == 0
             int sq = 1;
@@ -298,19 +331,19 @@ class Fields:
             }
         }
         """
-        nq = self.nprim
-        iq = 0 if self.transpose else -1
-        return p.size // nq, (p, u, p.size // nq)
+        ni = prod(p.shape[:-1])
+        return ni, (p, u, ni)
 
     @kernel
     def max_wavespeeds_array(
         self,
         u: NDArray[float],
         a: NDArray[float],
+        s: NDArray[int],
         ni: int = None,
     ):
         R"""
-        KERNEL void max_wavespeeds_array(double *u, double *a, int ni)
+        KERNEL void max_wavespeeds_array(real *RESTRICT u, real *RESTRICT a, int *RESTRICT s, int ni)
         {
             #if TRANSPOSE == 0
             int sq = 1;
@@ -329,16 +362,17 @@ class Fields:
                 {
                     u_reg[q] = u[i * si + q * sq];
                 }
-                cons_to_prim(u_reg, p_reg);
+                int status = cons_to_prim_check(u_reg, p_reg);
+                a[i] = max_wavespeed(p_reg);
 
-                for (int q = 0; q < NCONS; ++q)
+                if (status)
                 {
-                    a[i] = max_wavespeed(p_reg);
+                    s[i] = status;
                 }
             }
         }
         """
-        return a.size, (u, a, a.size)
+        return a.size, (u, a, s, a.size)
 
 
 @kernel_class
@@ -352,6 +386,7 @@ class SourceTerms:
         self._nprim = len(config.initial_data.primitive_fields)
         self._transpose = config.strategy.transpose
         self._cache_prim = config.strategy.cache_prim
+        self._real_type = config.strategy.real_type
 
         if config.physics.metric == "newtonian":
             hydro_lib = __import__("lib_euler")
@@ -379,6 +414,7 @@ class SourceTerms:
             TRANSPOSE=int(self._transpose),
             CACHE_PRIM=int(self._cache_prim),
             COORDS=self._coords,
+            REAL=self._real_type,
         )
 
     @property
@@ -389,7 +425,14 @@ class SourceTerms:
     Native implementation of source terms kernel
     """
     geometric_source_terms_code = R"""
-    KERNEL void geometric_source_terms(double *p, double *u, double *x, double *s, int ni, int nj, int nk)
+    KERNEL void geometric_source_terms(
+        real *RESTRICT p,
+        real *RESTRICT u,
+        real *RESTRICT x,
+        real *RESTRICT s,
+        int ni,
+        int nj,
+        int nk)
     {
         int nq = NCONS;
         int nd = ni * nj * nk * nq;
@@ -639,6 +682,7 @@ class Scheme:
         define_macros["CACHE_PRIM"] = int(config.strategy.cache_prim)
         define_macros["CACHE_GRAD"] = int(config.strategy.cache_grad)
         define_macros["USE_RK"] = int(config.scheme.time_integration != "fwd")
+        define_macros["REAL"] = config.strategy.real_type
 
         r = config.scheme.reconstruction
 
@@ -652,14 +696,22 @@ class Scheme:
             if not config.strategy.cache_grad:
                 device_funcs.append(plm_minmod)
 
+        define_macros["PLM_THETA"] = plm_theta
+
         if not config.strategy.cache_prim:
             device_funcs.append(hydro_lib.cons_to_prim)
 
-        device_funcs.append(hydro_lib.riemann_hlle)
+        if config.physics.metric == "newtonian":
+            riemann_solver = hydro_lib.riemann_hlle
+        if config.physics.metric == "minkowski":
+            riemann_solver = hydro_lib.riemann_hllc
+
+        define_macros["RIEMANN_SOLVER"] = riemann_solver.__name__
+        device_funcs.append(riemann_solver)
         device_funcs.append(self._godunov_fluxes)
+        device_funcs.append(self._godunov_fluxes_pair)
 
         self._dim = config.domain.dimensionality
-        self._plm_theta = plm_theta
         self._transpose = config.strategy.transpose
         self._define_macros = define_macros
         self._device_funcs = device_funcs
@@ -676,11 +728,10 @@ class Scheme:
     def _godunov_fluxes(self):
         R"""
         DEVICE void _godunov_fluxes(
-            double *prd,
-            double *grd,
-            double *urd,
+            real *prd,
+            real *grd,
+            real *urd,
             double fh[NCONS],
-            double plm_theta,
             int axis,
             int si,
             int sq)
@@ -728,8 +779,8 @@ class Scheme:
 
             for (int q = 0; q < NCONS; ++q)
             {
-                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], plm_theta);
-                double gr = plm_minmod(p[1][q], p[2][q], p[3][q], plm_theta);
+                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], PLM_THETA);
+                double gr = plm_minmod(p[1][q], p[2][q], p[3][q], PLM_THETA);
                 pm[q] = p[1][q] + 0.5 * gl;
                 pp[q] = p[2][q] - 0.5 * gr;
             }
@@ -771,8 +822,8 @@ class Scheme:
 
             for (int q = 0; q < NCONS; ++q)
             {
-                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], plm_theta);
-                double gr = plm_minmod(p[1][q], p[2][q], p[3][q], plm_theta);
+                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], PLM_THETA);
+                double gr = plm_minmod(p[1][q], p[2][q], p[3][q], PLM_THETA);
                 pm[q] = p[1][q] + 0.5 * gl;
                 pp[q] = p[2][q] - 0.5 * gr;
             }
@@ -791,18 +842,178 @@ class Scheme:
             #endif
 
             // =====================================================
-            riemann_hlle(pm, pp, fh, axis);
+            RIEMANN_SOLVER(pm, pp, fh, axis);
+        }
+        """
+
+    @device
+    def _godunov_fluxes_pair(self):
+        R"""
+        DEVICE void _godunov_fluxes_pair(
+            real *prd,
+            real *grd,
+            real *urd,
+            double fm[NCONS],
+            double fp[NCONS],
+            int axis,
+            int si,
+            int sq)
+        {
+            // Computes the Godunov fluxes on both faces of the zone at index
+            // 0 along the given axis. Each zone of the stencil is loaded (and
+            // if needed recovered to primitive variables) only once.
+            #if USE_PLM == 1
+            double pl[NCONS];
+            double pr[NCONS];
+            double ql[NCONS];
+            double qr[NCONS];
+            #endif
+
+            // =====================================================
+            #if USE_PLM == 0 && CACHE_PRIM == 0
+            double u[3][NCONS];
+            double p[3][NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                u[0][q] = urd[-1 * si + q * sq];
+                u[1][q] = urd[+0 * si + q * sq];
+                u[2][q] = urd[+1 * si + q * sq];
+            }
+            cons_to_prim(u[0], p[0]);
+            cons_to_prim(u[1], p[1]);
+            cons_to_prim(u[2], p[2]);
+
+            RIEMANN_SOLVER(p[0], p[1], fm, axis);
+            RIEMANN_SOLVER(p[1], p[2], fp, axis);
+
+            // =====================================================
+            #elif USE_PLM == 0 && CACHE_PRIM == 1
+            double p[3][NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                p[0][q] = prd[-1 * si + q * sq];
+                p[1][q] = prd[+0 * si + q * sq];
+                p[2][q] = prd[+1 * si + q * sq];
+            }
+            RIEMANN_SOLVER(p[0], p[1], fm, axis);
+            RIEMANN_SOLVER(p[1], p[2], fp, axis);
+
+            // =====================================================
+            #elif USE_PLM == 1 && CACHE_PRIM == 0 && CACHE_GRAD == 0
+            double u[5][NCONS];
+            double p[5][NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                u[0][q] = urd[-2 * si + q * sq];
+                u[1][q] = urd[-1 * si + q * sq];
+                u[2][q] = urd[+0 * si + q * sq];
+                u[3][q] = urd[+1 * si + q * sq];
+                u[4][q] = urd[+2 * si + q * sq];
+            }
+            cons_to_prim(u[0], p[0]);
+            cons_to_prim(u[1], p[1]);
+            cons_to_prim(u[2], p[2]);
+            cons_to_prim(u[3], p[3]);
+            cons_to_prim(u[4], p[4]);
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], PLM_THETA);
+                double gc = plm_minmod(p[1][q], p[2][q], p[3][q], PLM_THETA);
+                double gr = plm_minmod(p[2][q], p[3][q], p[4][q], PLM_THETA);
+                pl[q] = p[1][q] + 0.5 * gl;
+                pr[q] = p[2][q] - 0.5 * gc;
+                ql[q] = p[2][q] + 0.5 * gc;
+                qr[q] = p[3][q] - 0.5 * gr;
+            }
+            RIEMANN_SOLVER(pl, pr, fm, axis);
+            RIEMANN_SOLVER(ql, qr, fp, axis);
+
+            // =====================================================
+            #elif USE_PLM == 1 && CACHE_PRIM == 0 && CACHE_GRAD == 1
+            double u[3][NCONS];
+            double p[3][NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                u[0][q] = urd[-1 * si + q * sq];
+                u[1][q] = urd[+0 * si + q * sq];
+                u[2][q] = urd[+1 * si + q * sq];
+            }
+            cons_to_prim(u[0], p[0]);
+            cons_to_prim(u[1], p[1]);
+            cons_to_prim(u[2], p[2]);
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                double gl = grd[-1 * si + q * sq];
+                double gc = grd[+0 * si + q * sq];
+                double gr = grd[+1 * si + q * sq];
+                pl[q] = p[0][q] + 0.5 * gl;
+                pr[q] = p[1][q] - 0.5 * gc;
+                ql[q] = p[1][q] + 0.5 * gc;
+                qr[q] = p[2][q] - 0.5 * gr;
+            }
+            RIEMANN_SOLVER(pl, pr, fm, axis);
+            RIEMANN_SOLVER(ql, qr, fp, axis);
+
+            // =====================================================
+            #elif USE_PLM == 1 && CACHE_PRIM == 1 && CACHE_GRAD == 0
+            double p[5][NCONS];
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                p[0][q] = prd[-2 * si + q * sq];
+                p[1][q] = prd[-1 * si + q * sq];
+                p[2][q] = prd[+0 * si + q * sq];
+                p[3][q] = prd[+1 * si + q * sq];
+                p[4][q] = prd[+2 * si + q * sq];
+            }
+
+            for (int q = 0; q < NCONS; ++q)
+            {
+                double gl = plm_minmod(p[0][q], p[1][q], p[2][q], PLM_THETA);
+                double gc = plm_minmod(p[1][q], p[2][q], p[3][q], PLM_THETA);
+                double gr = plm_minmod(p[2][q], p[3][q], p[4][q], PLM_THETA);
+                pl[q] = p[1][q] + 0.5 * gl;
+                pr[q] = p[2][q] - 0.5 * gc;
+                ql[q] = p[2][q] + 0.5 * gc;
+                qr[q] = p[3][q] - 0.5 * gr;
+            }
+            RIEMANN_SOLVER(pl, pr, fm, axis);
+            RIEMANN_SOLVER(ql, qr, fp, axis);
+
+            // =====================================================
+            #elif USE_PLM == 1 && CACHE_PRIM == 1 && CACHE_GRAD == 1
+            for (int q = 0; q < NCONS; ++q)
+            {
+                double yl = prd[-1 * si + q * sq];
+                double yc = prd[+0 * si + q * sq];
+                double yr = prd[+1 * si + q * sq];
+                double gl = grd[-1 * si + q * sq];
+                double gc = grd[+0 * si + q * sq];
+                double gr = grd[+1 * si + q * sq];
+                pl[q] = yl + 0.5 * gl;
+                pr[q] = yc - 0.5 * gc;
+                ql[q] = yc + 0.5 * gc;
+                qr[q] = yr - 0.5 * gr;
+            }
+            RIEMANN_SOLVER(pl, pr, fm, axis);
+            RIEMANN_SOLVER(ql, qr, fp, axis);
+            #endif
         }
         """
 
     godunov_fluxes_code = R"""
     KERNEL void godunov_fluxes(
-        double *prd,
-        double *urd,
-        double *grd,
-        double *fwr,
-        double *da,
-        double plm_theta,
+        real *RESTRICT prd,
+        real *RESTRICT urd,
+        real *RESTRICT grd,
+        real *RESTRICT fwr,
+        real *RESTRICT da,
         int ni,
         int nj,
         int nk)
@@ -841,7 +1052,6 @@ class Scheme:
         #endif
 
         int sf = TRANSPOSE ? 1 : nq; // stride associated with field data
-        double fm[NCONS];
 
         #if DIM == 1
         FOR_RANGE_1D(2, ni - 1)
@@ -859,12 +1069,13 @@ class Scheme:
             int nc = i * si + j * sj + k * sk;
             #endif
 
+            double fm[NCONS];
             double am;
 
             #if DIM >= 1
             am = da[(0 * nd + nc) / sf];
 
-            _godunov_fluxes(prd + nc, grd + 0 * nd + nc, urd + nc, fm, plm_theta, 1, si, sq);
+            _godunov_fluxes(prd + nc, grd + 0 * nd + nc, urd + nc, fm, 1, si, sq);
             for (int q = 0; q < NCONS; ++q)
             {
                 fwr[0 * nd + nc + q * sq] = fm[q] * am;
@@ -874,7 +1085,7 @@ class Scheme:
             #if DIM >= 2
             am = da[(1 * nd + nc) / sf];
 
-            _godunov_fluxes(prd + nc, grd + 1 * nd + nc, urd + nc, fm, plm_theta, 2, sj, sq);
+            _godunov_fluxes(prd + nc, grd + 1 * nd + nc, urd + nc, fm, 2, sj, sq);
             for (int q = 0; q < NCONS; ++q)
             {
                 fwr[1 * nd + nc + q * sq] = fm[q] * am;
@@ -884,7 +1095,7 @@ class Scheme:
             #if DIM >= 3
             am = da[(2 * nd + nc) / sf];
 
-            _godunov_fluxes(prd + nc, grd + 2 * nd + nc, urd + nc, fm, plm_theta, 3, sk, sq);
+            _godunov_fluxes(prd + nc, grd + 2 * nd + nc, urd + nc, fm, 3, sk, sq);
             for (int q = 0; q < NCONS; ++q)
             {
                 fwr[2 * nd + nc + q * sq] = fm[q] * am;
@@ -902,7 +1113,6 @@ class Scheme:
         grd: NDArray[float],
         fwr: NDArray[float],
         da: NDArray[float],
-        plm_theta: float = None,
         ni: int = None,
         nj: int = None,
         nk: int = None,
@@ -971,27 +1181,25 @@ class Scheme:
             May be invalid in two layers of guard zones on the left and one
             layer of guard zones at the right of each non-trivial array axis.
         """
-        plm = plm_theta if plm_theta is not None else self._plm_theta
         dim = self._dim
         s = urd.shape[:3]
-        return s[:dim], (prd, urd, grd, fwr, da, plm, *s)
+        return s[:dim], (prd, urd, grd, fwr, da, *s)
 
     """
     Native implementation of the update_cons kernel
     """
     update_cons_code = R"""
     KERNEL void update_cons(
-        double *prd,
-        double *grd,
-        double *urk,
-        double *urd,
-        double *uwr,
-        double *stm,
-        double *da,
-        double *dv,
+        real *RESTRICT prd,
+        real *RESTRICT grd,
+        real *RESTRICT urk,
+        real *RESTRICT urd,
+        real *RESTRICT uwr,
+        real *RESTRICT stm,
+        real *RESTRICT da,
+        real *RESTRICT dv,
         double dt,
         double rk,
-        double plm_theta,
         int ni,
         int nj,
         int nk)
@@ -1030,19 +1238,6 @@ class Scheme:
         #endif
         int sf = TRANSPOSE ? 1 : nq; // stride associated with field data
 
-        #if DIM >= 1
-        double fm[NCONS];
-        double fp[NCONS];
-        #endif
-        #if DIM >= 2
-        double gm[NCONS];
-        double gp[NCONS];
-        #endif
-        #if DIM >= 3
-        double hm[NCONS];
-        double hp[NCONS];
-        #endif
-
         #if DIM == 1
         FOR_RANGE_1D(2, ni - 2)
         #elif DIM == 2
@@ -1066,39 +1261,57 @@ class Scheme:
             #endif
 
             #if DIM >= 1
-            _godunov_fluxes(prd + nccc, grd + 0 * nd + nccc, urd + nccc, fm, plm_theta, 1, si, sq);
-            _godunov_fluxes(prd + nrcc, grd + 0 * nd + nrcc, urd + nrcc, fp, plm_theta, 1, si, sq);
+            double fm[NCONS];
+            double fp[NCONS];
+            #endif
+            #if DIM >= 2
+            double gm[NCONS];
+            double gp[NCONS];
+            #endif
+            #if DIM >= 3
+            double hm[NCONS];
+            double hp[NCONS];
+            #endif
+
+            #if DIM >= 1
+            _godunov_fluxes_pair(prd + nccc, grd + 0 * nd + nccc, urd + nccc, fm, fp, 1, si, sq);
             #endif
             #if DIM >= 2
-            _godunov_fluxes(prd + nccc, grd + 1 * nd + nccc, urd + nccc, gm, plm_theta, 2, sj, sq);
-            _godunov_fluxes(prd + ncrc, grd + 1 * nd + ncrc, urd + ncrc, gp, plm_theta, 2, sj, sq);
+            _godunov_fluxes_pair(prd + nccc, grd + 1 * nd + nccc, urd + nccc, gm, gp, 2, sj, sq);
             #endif
             #if DIM >= 3
-            _godunov_fluxes(prd + nccc, grd + 2 * nd + nccc, urd + nccc, hm, plm_theta, 3, sk, sq);
-            _godunov_fluxes(prd + nccr, grd + 2 * nd + nccr, urd + nccr, hp, plm_theta, 3, sk, sq);
+            _godunov_fluxes_pair(prd + nccc, grd + 2 * nd + nccc, urd + nccc, hm, hp, 3, sk, sq);
             #endif
 
+            // Face areas and the time step over the cell volume are the same
+            // for each field, so are loaded once per zone.
+            #if DIM >= 1
+            double aim = da[(0 * nd + nccc) / sf];
+            double aip = da[(0 * nd + nrcc) / sf];
+            #endif
+            #if DIM >= 2
+            double ajm = da[(1 * nd + nccc) / sf];
+            double ajp = da[(1 * nd + ncrc) / sf];
+            #endif
+            #if DIM >= 3
+            double akm = da[(2 * nd + nccc) / sf];
+            double akp = da[(2 * nd + nccr) / sf];
+            #endif
+            double dt_dv = dt / dv[nccc / sf];
+
             for (int q = 0; q < NCONS; ++q)
             {
                 int n = nccc + q * sq;
                 double du = 0.0;
-                double am;
-                double ap;
 
                 #if DIM >= 1
-                am = da[(0 * nd + nccc) / sf];
-                ap = da[(0 * nd + nrcc) / sf];
-                du -= fp[q] * ap - fm[q] * am;
+                du -= fp[q] * aip - fm[q] * aim;
                 #endif
                 #if DIM >= 2
-                am = da[(1 * nd + nccc) / sf];
-                ap = da[(1 * nd + ncrc) / sf];
-                du -= gp[q] * ap - gm[q] * am;
+                du -= gp[q] * ajp - gm[q] * ajm;
                 #endif
                 #if DIM >= 3
-                am = da[(2 * nd + nccc) / sf];
-                ap = da[(2 * nd + nccr) / sf];
-                du -= hp[q] * ap - hm[q] * am;
+                du -= hp[q] * akp - hm[q] * akm;
                 #endif
 
                 if (stm)
@@ -1106,7 +1319,7 @@ class Scheme:
                     du += stm[n];
                 }
 
-                du *= dt / dv[n / sf];
+                du *= dt_dv;
                 uwr[n] = urd[n] + du;
 
                 #if USE_RK == 1
@@ -1134,7 +1347,6 @@ class Scheme:
         dv: NDArray[float],
         dt: float,
         rk: float,
-        plm_theta: float = None,
         ni: int = None,
         nj: int = None,
         nk: int = None,
@@ -1243,21 +1455,20 @@ class Scheme:
            urk * rk + (uwr + du) * (1 - rk)` where `du` is the time-difference
            of the conserved density.
         """
-        plm = plm_theta if plm_theta is not None else self._plm_theta
         dim = self._dim
         s = urd.shape[:3]
-        return s[:dim], (prd, grd, urk, urd, uwr, stm, da, dv, dt, rk, plm, *s)
+        return s[:dim], (prd, grd, urk, urd, uwr, stm, da, dv, dt, rk, *s)
 
     """
     Native implementation of the update_cons_from_fluxes_code kernel
     """
     update_cons_from_fluxes_code = R"""
     KERNEL void update_cons_from_fluxes(
-        double *urk,
-        double *q,
-        double *f,
-        double *stm,
-        double *dv,
+        real *RESTRICT urk,
+        real *RESTRICT q,
+        real *RESTRICT f,
+        real *RESTRICT stm,
+        real *RESTRICT dv,
         double dt,
         double rk,
         int ni,
@@ -1320,10 +1531,11 @@ class Scheme:
             int nccr = (i + 0) * si + (j + 0) * sj + (k + 1) * sk;
             #endif
 
-            double *uc = &q[nccc];
+            real *uc = &q[nccc];
             #if USE_RK == 1
-            double *u0 = &urk[nccc];
+            real *u0 = &urk[nccc];
             #endif
+            double dt_dv = dt / dv[nccc / sf];
 
             for (int q = 0; q < NCONS; ++q)
             {
@@ -1350,7 +1562,7 @@ class Scheme:
                     du += stm[nccc + q * sq];
                 }
 
-                du *= dt / dv[nccc / sf];
+                du *= dt_dv;
                 double u1 = uc[q * sq] + du;
 
                 #if USE_RK == 1
@@ -1544,13 +1756,14 @@ class FillGuardZones:
 class PatchState:
     """ """
 
-    def __init__(self, n, t, u, box, to_user_prim, max_wavespeed):
+    def __init__(self, n, t, u, box, to_user_prim, max_wavespeed, c2p_check):
         self._n = n
         self._t = t
         self._u = u
         self._box = box
         self._to_user_prim = to_user_prim
         self._max_wavespeed = max_wavespeed
+        self._c2p_check = c2p_check
 
     @property
     def box(self):
@@ -1582,6 +1795,9 @@ class PatchState:
     def maximum_wavespeed(self):
         return self._max_wavespeed(self._u)
 
+    def check_c2p_status(self):
+        self._c2p_check()
+
     def timestep(self, cfl_number):
         return cfl_number * self.minimum_zone_size() / self.maximum_wavespeed()
 
@@ -1589,9 +1805,10 @@ class PatchState:
 class State:
     """ """
 
-    def __init__(self, box: CoordinateBox, states: list[PatchState]):
+    def __init__(self, box: CoordinateBox, states: list[PatchState], streams=None):
         self._box = box
         self._states = states
+        self._streams = streams or [nullcontext()] * len(states)
 
     @property
     def box(self):
@@ -1621,7 +1838,24 @@ class State:
         return float(min(s.minimum_zone_size() for s in self._states))
 
     def maximum_wavespeed(self):
-        return float(max(s.maximum_wavespeed() for s in self._states))
+        # Each patch reduction is launched on that patch's stream, and none of
+        # the results are read back until all have been launched, so patches
+        # can overlap on the device.
+        amax = list()
+
+        for state, stream in zip(self._states, self._streams):
+            with stream:
+                amax.append(state.maximum_wavespeed())
+
+        a_max = float(max(amax))
+
+        # Primitive recovery failures are read back only after the wavespeed
+        # results, so the status checks don't serialize the patches.
+        for state, stream in zip(self._states, self._streams):
+            with stream:
+                state.check_c2p_status()
+
+        return a_max
 
     def timestep(self, cfl_number):
         return cfl_number * self.minimum_zone_size() / self.maximum_wavespeed()
@@ -1767,6 +2001,9 @@ def patch_solver(
     if hardware == "cpu":
         import numpy as xp
 
+    # All arrays passed to kernels are stored in the strategy's precision
+    zeros = partial(xp.zeros, dtype=strategy.dtype)
+
     (
         plm_gradient,
         update_cons,
@@ -1782,10 +2019,11 @@ def patch_solver(
     nprim = primitive.shape[-1]
     ncons = nprim
     dx = box.grid_spacing[0]
-    p = xp.array(primitive)
+    p = xp.array(primitive, dtype=strategy.dtype)
     t = time
     n = iteration
-    a = space.create(xp.zeros)  # wavespeeds array
+    a = space.create(zeros)  # wavespeeds array
+    s = space.create(partial(xp.zeros, dtype="int32"))  # c2p status array
     interior_box = box.trim(2)
 
     del primitive
@@ -1795,8 +2033,9 @@ def patch_solver(
         """
         Return primitives in standard layout host memory and with no guards
         """
-        p = space.create(xp.zeros, fields=nprim)
-        cons_to_prim(u, p)
+        p = space.create(zeros, fields=nprim)
+        cons_to_prim(u, p, s)
+        c2p_check()
 
         try:
             return p[space.interior].get()
@@ -1807,9 +2046,21 @@ def patch_solver(
         """
         Return the maximum wavespeed on this grid patch (guard zones excluded)
         """
-        max_wavespeeds(u, a)
+        max_wavespeeds(u, a, s)
         return a[space.interior].max()
 
+    def c2p_check():
+        """
+        Raise an exception if the primitive recovery failed in any zone
+
+        The status array is only written in failed zones, so it accumulates
+        failures from every kernel launch since the last check.
+        """
+        if s.any():
+            index = tuple(int(i[0]) for i in xp.nonzero(s))
+            message = C2P_ERRORS[int(s[index])]
+            raise RuntimeError(f"cons_to_prim {message} in zone {index}")
+
     # =========================================================================
     # Time integration scheme: fwd and rk1 should produce the same result, but
     # rk1 can be used to test the expense of caching the conserved variables,
@@ -1834,15 +2085,15 @@ def patch_solver(
     if config.coordinates == "cylindrical-polar":
         coords = CylindricalPolarCoordinates()
 
-    dv = space.create(xp.zeros, fields=1, data=coords.cell_volumes(box))
-    da = space.create(xp.zeros, vectors=dim, data=coords.face_areas(box))
-    xv = space.create(xp.zeros, vectors=dim, data=coords.cell_vertices(box))
+    dv = space.create(zeros, fields=1, data=coords.cell_volumes(box))
+    da = space.create(zeros, vectors=dim, data=coords.face_areas(box))
+    xv = space.create(zeros, vectors=dim, data=coords.cell_vertices(box))
 
     # =========================================================================
     # Array of cached Runge-Kutta conserved fields
     # =========================================================================
     if rks:
-        u0 = space.create(xp.zeros, fields=ncons)  # RK cons
+        u0 = space.create(zeros, fields=ncons)  # RK cons
     else:
         u0 = None
 
@@ -1852,16 +2103,22 @@ def patch_solver(
     # the conserved data and an array of Godunov fluxes.
     # =========================================================================
     if cache_flux:
-        fh = space.create(xp.zeros, fields=ncons, vectors=dim)
-        u1 = space.create(xp.zeros, fields=ncons)
+        fh = space.create(zeros, fields=ncons, vectors=dim)
+        u1 = space.create(zeros, fields=ncons)
         prim_to_cons(p, u1)
     else:
         p1 = p if cache_prim else None
-        u1 = space.create(xp.zeros, fields=ncons)
-        u2 = space.create(xp.zeros, fields=ncons)
+        u1 = space.create(zeros, fields=ncons)
+        u2 = space.create(zeros, fields=ncons)
         prim_to_cons(p, u1)
         prim_to_cons(p, u2)
 
+        if rks:
+            # The RK cache takes turns with u1 and u2 as the read and write
+            # buffers (see the main loop), so its guard zones must hold valid
+            # data too; they are not necessarily refilled by a BC.
+            prim_to_cons(p, u0)
+
     # =========================================================================
     # Array for the primitive fields if primitives or gradients are cached
     # =========================================================================
@@ -1876,7 +2133,7 @@ def patch_solver(
     # Array for the primitive field gradients if gradients are being cached
     # =========================================================================
     if cache_grad:
-        g1 = space.create(xp.zeros, fields=ncons, vectors=dim)
+        g1 = space.create(zeros, fields=ncons, vectors=dim)
     else:
         g1 = None
 
@@ -1884,38 +2141,46 @@ def patch_solver(
     # Arrays for source terms, including driving fields
     # =========================================================================
     if config.forcing is not None or coords.needs_geometrical_source_terms:
-        stm = space.create(xp.zeros, fields=ncons)
+        stm = space.create(zeros, fields=ncons)
     else:
         stm = None
 
     if (forcing := config.forcing) is not None:
-        udr = space.create(xp.zeros, fields=ncons)
-        pdr = space.create(xp.zeros, fields=nprim, data=initial_prim(box))
-        rdr = space.create(xp.zeros, fields=1, data=forcing.rate_array(box))
+        udr = space.create(zeros, fields=ncons)
+        sdr = space.create(zeros, fields=ncons)  # scratch for driving terms
+        pdr = space.create(zeros, fields=nprim, data=initial_prim(box))
+        rdr = space.create(zeros, fields=1, data=forcing.rate_array(box))
         prim_to_cons(pdr, udr)
-        del pdr
+        rdv = rdr * dv  # driving rate times cell volume, constant in time
+        del pdr, rdr
 
-    dt = yield PatchState(n, t, u1, interior_box, c2p_user, amax)
+    dt = yield PatchState(n, t, u1, interior_box, c2p_user, amax, c2p_check)
 
     # =========================================================================
     # Main loop: yield states until the caller stops calling next
     # =========================================================================
     while True:
-        if rks:
+        if rks and cache_flux:
             u0[...] = u1[...]
 
         for rk in rks or [0.0]:
-            if stm is not None:
-                stm[...] = 0.0
-
             if cache_prim:
-                cons_to_prim(u1, p1)
+                cons_to_prim(u1, p1, s)
 
+            # The source term array is not cleared between sub-steps: the
+            # geometric source terms overwrite it, and otherwise the driving
+            # terms do. Guard zone values are not used.
             if coords.needs_geometrical_source_terms:
                 geometric_source_terms(p1, u1, xv, stm)
 
             if forcing is not None:
-                stm += (udr - u1) * rdr * dv
+                xp.subtract(udr, u1, out=sdr)
+
+                if coords.needs_geometrical_source_terms:
+                    sdr *= rdv
+                    stm += sdr
+                else:
+                    xp.multiply(sdr, rdv, out=stm)
 
             if cache_grad:
                 plm_gradient(p1, g1)
@@ -1924,13 +2189,20 @@ def patch_solver(
                 update_cons_from_fluxes(u0, u1, fh, stm, dv, dt, rk)
             else:
                 update_cons(p1, g1, u0, u1, u2, stm, da, dv, dt, rk)
-                u1, u2 = u2, u1
+
+                if rks and rk == 0.0:
+                    # The first RK sub-step does not read u0, and it leaves
+                    # the start-of-step state in the read buffer; keep that
+                    # buffer as the RK cache instead of copying into u0.
+                    u0, u1, u2 = u1, u2, u0
+                else:
+                    u1, u2 = u2, u1
 
             yield FillGuardZones(u1)
 
         t += dt
         n += 1
-        dt = yield PatchState(n, t, u1, interior_box, c2p_user, amax)
+        dt = yield PatchState(n, t, u1, interior_box, c2p_user, amax, c2p_check)
 
 
 def doc():
@@ -2005,6 +2277,16 @@ def make_solver(config: Sailfish, checkpoint: dict = None):
         streams.append(stream)
         solvers.append(solver)
 
+    # The per-thread default stream is a different stream on each thread, so
+    # if the patches are advanced by a thread pool, the main thread cannot
+    # enter the stream a patch was advanced on. The wavespeed reductions are
+    # then run on the legacy default stream, which is ordered after the
+    # (blocking) per-thread streams.
+    if hardware == "gpu" and gpu_streams == "per-thread" and num_threads > 1:
+        reduce_streams = None
+    else:
+        reduce_streams = streams
+
     timestep = None
 
     def next_with(arg):
@@ -2018,7 +2300,7 @@ def make_solver(config: Sailfish, checkpoint: dict = None):
             events = list(pool.map(next_with, zip(streams, solvers)))
 
             if type(events[0]) is PatchState:
-                timestep = yield State(config.domain, events)
+                timestep = yield State(config.domain, events, reduce_streams)
 
             elif type(events[0]) is FillGuardZones:
                 fill_guard_zones([e.array for e in events], boundary)
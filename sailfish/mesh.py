@@ -147,6 +147,21 @@ class LogSphericalMesh(NamedTuple):
         q = (j + 0.5) * self.polar_spacing
         return r, q
 
+    def cell_coordinates_grid(self, t, i0=0, i1=None, j0=0, j1=None):
+        """
+        Return 2D arrays (r, theta) of zone center proper coordinates.
+
+        The arrays have shape `(i1 - i0, j1 - j0)` and are indexed like the
+        zones, i.e. `r[i, j], q[i, j] = cell_coordinates(t, i0 + i, j0 + j)`.
+        """
+        from numpy import array, arange, meshgrid
+
+        if j1 is None:
+            j1 = self.num_polar_zones
+        r = array(self.zone_centers(t, i0, i1))
+        q = (arange(j0, j1) + 0.5) * self.polar_spacing
+        return tuple(meshgrid(r, q, indexing="ij"))
+
     @property
     def num_radial_zones(self):
         return int(log10(self.r1 / self.r0) * self.num_zones_per_decade)
@@ -177,6 +177,20 @@ class SetupBase(ABC):
         """
         pass
 
+    def primitive_vec(self, time, coordinates, primitive):
+        """
+        Set initial or boundary data on a grid of points.
+
+        This method may be overridden to set the primitive variables for many
+        zones at once, which avoids a Python function call per zone on large
+        meshes. The `coordinates` argument is a tuple of arrays, one for each
+        coordinate axis, and `primitive` has the same shape plus a trailing
+        axis for the fields. Solvers which support this method fall back to
+        calling `primitive` once per zone if it raises `NotImplementedError`,
+        which is the default.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def mesh(self, resolution: int):
         """
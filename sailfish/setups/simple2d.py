@@ -21,6 +21,9 @@ class UniformPolar(SetupBase):
         primitive[2] = 0.0
         primitive[3] = 1.0
 
+    def primitive_vec(self, t, _, primitive):
+        primitive[...] = [1.0, 0.0, 0.0, 1.0]
+
     def mesh(self, num_zones_per_decade):
         return LogSphericalMesh(1.0, 50.0, num_zones_per_decade, polar_grid=True)
 
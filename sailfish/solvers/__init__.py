@@ -7,6 +7,10 @@ class SolverInitializationError(Exception):
     """An invalid runtime configuration"""
 
 
+class SolverRuntimeError(Exception):
+    """A failure while advancing the solution, e.g. in primitive recovery"""
+
+
 __solver_extension_modules = list()
 
 
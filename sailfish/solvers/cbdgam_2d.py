@@ -502,18 +502,13 @@ class Solver(SolverBase):
 
             # 2. Set outflow BC on the left/right patch edges
             if patch_index == 0:
-                for i in range(ng):
-                    pc[i] = pc[ng]
+                pc[:+ng] = pc[+ng : +ng + 1]
             if patch_index == len(self.patches) - 1:
-                for i in range(pc.shape[0] - ng, pc.shape[0]):
-                    pc[i] = pc[-ng - 1]
+                pc[-ng:] = pc[-ng - 1 : -ng]
 
             # 3. Set outflow BC on bottom and top edges
-            for i in range(ng):
-                pc[:, i] = pc[:, ng]
-
-            for i in range(pc.shape[1] - ng, pc.shape[1]):
-                pc[:, i] = pc[:, -ng - 1]
+            pc[:, :+ng] = pc[:, +ng : +ng + 1]
+            pc[:, -ng:] = pc[:, -ng - 1 : -ng]
 
     def new_iteration(self):
         for patch in self.patches:
@@ -6,7 +6,7 @@ from typing import NamedTuple
 from sailfish.mesh import PlanarCartesianMesh
 from sailfish.solver_base import SolverBase
 from sailfish.kernel.library import Library
-from numpy.polynomial.legendre import leggauss, Legendre
+from numpy.polynomial.legendre import leggauss, legval, legder
 import numpy as np
 
 NUM_CONS = 1
@@ -23,46 +23,29 @@ class CellData:
         if order <= 0:
             raise ValueError("cell order must be at least 1")
 
-        def leg(x, n, m=0):
-            c = [(2 * n + 1) ** 0.5 if i is n else 0.0 for i in range(n + 1)]
-            return Legendre(c).deriv(m)(x)
-
-        f = [-1.0, 1.0]  # xsi-coordinate of faces
+        f = np.array([-1.0, 1.0])  # xsi-coordinate of faces
         g, w = leggauss(order)
+        c = np.diag([(2 * n + 1) ** 0.5 for n in range(order)])  # column n is P_n
         self.gauss_points = g
         self.weights = w
-        self.phi_faces = np.array([[leg(x, n, m=0) for n in range(order)] for x in f])
-        self.phi_value = np.array([[leg(x, n, m=0) for n in range(order)] for x in g])
-        self.phi_deriv = np.array([[leg(x, n, m=1) for n in range(order)] for x in g])
+        self.phi_faces = legval(f, c).T
+        self.phi_value = legval(g, c).T
+        self.phi_deriv = legval(g, legder(c, axis=0)).T
+        self.phi_faces_nhat = -f[:, None] * self.phi_faces  # surface term
+        self.phi_deriv_weights = w[:, None] * self.phi_deriv  # volume term
         self.order = order
 
     def to_weights(self, ux):
-        w = self.weights
-        p = self.phi_value
-        uw = np.zeros([NUM_CONS, self.order])
-
-        for q in range(NUM_CONS):
-            for n in range(self.order):
-                for j in range(self.num_points):
-                    uw[q, n] += ux[q, j] * p[j][n] * w[j] * 0.5
-
-        return uw
+        """
+        Project point values `ux[..., q, j]` onto the basis weights `uw[..., q, n]`.
+        """
+        return 0.5 * ux @ (self.phi_value * self.weights[:, None])
 
     def sample(self, uw, j):
-        ux = np.zeros(NUM_CONS)
-
-        for q in range(NUM_CONS):
-            for n in range(self.order):
-                ux[q] += uw[q, n] * self.phi_value[j, n]
-        return ux
+        return uw @ self.phi_value[j]
 
     def sample_face(self, uw, j):
-        ux = np.zeros(NUM_CONS)
-
-        for q in range(NUM_CONS):
-            for n in range(self.order):
-                ux[q] += uw[q, n] * self.phi_faces[j, n]
-        return ux
+        return uw @ self.phi_faces[j]
 
     @property
     def num_points(self):
@@ -116,6 +99,13 @@ class CellData:
 
 
 def rhs(physics, uw, cell, dx, uwdot):
+    """
+    Compute the time derivative of the DG weights, vectorized over zones.
+
+    The weights array `uw` has shape (num_zones, 1, order). The boundaries
+    are periodic. The flux through face i + 1/2 is the same as the flux
+    through face (i + 1) - 1/2, so one Riemann problem is solved per face.
+    """
     if physics.equation == "advection":
         wavespeed = physics.wavespeed
 
@@ -131,52 +121,27 @@ def rhs(physics, uw, cell, dx, uwdot):
     elif physics.equation == "burgers":
 
         def flux(ux):
-            return np.array([0.5 * ux[0] * ux[0]])
+            return 0.5 * ux * ux
 
         def upwind(ul, ur):
-            al = ul[0]
-            ar = ur[0]
-
-            if al > 0.0 and ar > 0.0:
-                return flux(ul)
-            elif al < 0.0 and ar < 0.0:
-                return flux(ur)
-            else:
-                return np.array([0.0])
+            fl = np.where((ul > 0.0) & (ur > 0.0), flux(ul), 0.0)
+            fr = np.where((ul < 0.0) & (ur < 0.0), flux(ur), 0.0)
+            return fl + fr
 
-    nz = uw.shape[0]
     pv = cell.phi_value
     pf = cell.phi_faces
-    pd = cell.phi_deriv
-    w = cell.weights
-    nhat = np.array([-1.0, 1.0])
-
-    for i in range(nz):
-        im1 = (i - 1 + nz) % nz
-        ip1 = (i + 1 + nz) % nz
-
-        uimh_l = cell.sample_face(uw[im1], 1)
-        uimh_r = cell.sample_face(uw[i], 0)
-        uiph_l = cell.sample_face(uw[i], 1)
-        uiph_r = cell.sample_face(uw[ip1], 0)
-        fimh = upwind(uimh_l, uimh_r)
-        fiph = upwind(uiph_l, uiph_r)
-
-        fs = np.array([fimh, fiph]).T
-        ux = np.array([cell.sample(uw[i], j) for j in range(cell.order)]).T
-        fx = np.array([flux(u) for u in ux.T]).T
+    pfh = cell.phi_faces_nhat
+    pdw = cell.phi_deriv_weights
 
-        for n in range(cell.order):
-            udot_s = 0.0
-            udot_v = 0.0
+    u = uw[:, 0]
+    fimh = upwind(np.roll(u @ pf[1], 1), u @ pf[0])
+    fiph = np.roll(fimh, -1)
+    fx = flux(u @ pv.T)
 
-            for j in range(2):
-                udot_s -= fs[0, j] * pf[j, n] * nhat[j] / dx
+    udot_s = np.outer(fimh, pfh[0]) + np.outer(fiph, pfh[1])
+    udot_v = fx @ pdw
 
-            for j in range(cell.num_points):
-                udot_v += fx[0, j] * pd[j, n] * w[j] / dx
-
-            uwdot[i, 0, n] = udot_s + udot_v
+    uwdot[:, 0] = (udot_s + udot_v) / dx
 
 
 class Options(NamedTuple):
@@ -254,12 +219,15 @@ class Solver(SolverBase):
 
         self.lib = Library(source, mode=mode, debug=True)
 
+        # The C kernel is hard-wired for third-order Burgers; other cases use
+        # the vectorized rhs function.
+        self.use_kernel = options.order == 3 and physics.equation == "burgers"
+
         if solution is None:
             num_zones = mesh.shape[0]
             xf = mesh.faces(0, num_zones)  # face coordinates
             px = np.zeros([num_zones, 1, cell.num_points])
             ux = np.zeros([num_zones, 1, cell.num_points])
-            uw = np.zeros([num_zones, 1, cell.order])
             dx = mesh.dx
 
             for i in range(num_zones):
@@ -269,10 +237,7 @@ class Solver(SolverBase):
                     setup.primitive(time, xj, px[i, :, j])
 
             ux[...] = px[...]  # the conserved variable is also the primitive
-
-            for i in range(num_zones):
-                uw[i] = cell.to_weights(ux[i])
-            self.conserved_w = uw
+            self.conserved_w = cell.to_weights(ux)
         else:
             self.conserved_w = solution
 
@@ -336,8 +301,10 @@ class Solver(SolverBase):
     def advance(self, dt):
         def udot(u):
             udot = np.zeros_like(u)
-            # rhs(self._physics, u, self.cell, self.mesh.dx, udot)
-            self.lib.scdg_1d_udot[u.shape[0]](u, udot, self.mesh.dx)
+            if self.use_kernel:
+                self.lib.scdg_1d_udot[u.shape[0]](u, udot, self.mesh.dx)
+            else:
+                rhs(self._physics, u, self.cell, self.mesh.dx, udot)
             return udot
 
         if self._options.integrator == "rk1":
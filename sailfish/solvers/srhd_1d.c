@@ -92,7 +92,13 @@ PRIVATE void primitive_to_conserved(const double *prim, double *cons, double dv)
     cons[3] = dv * m * prim[3];
 }
 
-PRIVATE void conserved_to_primitive(double *cons, double *prim, double dv, double coordinate)
+// Status codes returned by conserved_to_primitive, and written to the status
+// array of the kernel that calls it. Zero means success.
+#define C2P_MAX_ITERATION 1
+#define C2P_NON_POSITIVE_ENERGY 2
+#define C2P_NON_POSITIVE_PRESSURE 3
+
+PRIVATE int conserved_to_primitive(double *cons, double *prim, double dv)
 {
     const double newton_iter_max = 500;
     const double error_tolerance = 1e-12 * (cons[0] + cons[2]) / dv;
@@ -100,13 +106,15 @@ PRIVATE void conserved_to_primitive(double *cons, double *prim, double dv, doubl
     const double m               = cons[0] / dv;
     const double tau             = cons[2] / dv;
     const double ss              = cons[1] / dv * cons[1] / dv;
+    const double tau_plus_m      = tau + m;
+    const double gm_minus_one    = gm - 1.0;
     int iteration                = 0;
     double p                     = prim[2];
     double w0;
     double f;
 
     while (1) {
-        const double et = tau + p + m;
+        const double et = tau_plus_m + p;
         const double b2 = min2(ss / et / et, 1.0 - 1e-10);
         const double w2 = 1.0 / (1.0 - b2);
         const double w  = sqrt(w2);
@@ -116,7 +124,7 @@ PRIVATE void conserved_to_primitive(double *cons, double *prim, double dv, doubl
         const double a2 = gm * p / (d * h);
         const double g  = b2 * a2 - 1.0;
 
-        f  = d * e * (gm - 1.0) - p;
+        f  = d * e * gm_minus_one - p;
         p -= f / g;
 
         if (fabs(f) < error_tolerance || iteration == newton_iter_max) {
@@ -127,7 +135,7 @@ PRIVATE void conserved_to_primitive(double *cons, double *prim, double dv, doubl
     }
 
     prim[0] = m / w0;
-    prim[1] = w0 * cons[1] / dv / (tau + m + p);
+    prim[1] = w0 * cons[1] / dv / (tau_plus_m + p);
     prim[2] = p;
     prim[3] = cons[3] / cons[0];
 
@@ -141,27 +149,16 @@ PRIVATE void conserved_to_primitive(double *cons, double *prim, double dv, doubl
         // primitive_to_conserved(prim, cons, dv);
     }
 
-    #if (EXEC_MODE != EXEC_GPU)
     if (iteration == newton_iter_max) {
-        printf(
-            "[FATAL] srhd_1d_conserved_to_primitive reached max "
-            "iteration at position %.3f "
-            "cons = [%.3e %.3e %.3e] error = %.3e\n", coordinate, cons[0], cons[1], cons[2], f);
-        exit(1);
+        return C2P_MAX_ITERATION;
     }
     if (cons[2] <= 0.0) {
-        printf(
-            "[FATAL] srhd_1d_conserved_to_primitive found non-positive "
-            "or NaN total energy tau=%.5e at position %.3f\n", cons[2], coordinate);
-        exit(1);
+        return C2P_NON_POSITIVE_ENERGY;
     }
     if (prim[2] <= 0.0 || prim[2] != prim[2]) {
-        printf(
-            "[FATAL] srhd_1d_conserved_to_primitive found non-positive "
-            "or NaN pressure p=%.5e at position %.3f\n", prim[2], coordinate);
-        exit(1);
+        return C2P_NON_POSITIVE_PRESSURE;
     }
-    #endif
+    return 0;
 }
 
 PRIVATE void primitive_to_flux(const double *prim, const double *cons, double *flux)
@@ -428,6 +425,7 @@ PUBLIC void srhd_1d_conserved_to_primitive(
     double *face_positions, // :: $.shape == (num_zones + 1,)
     double *conserved,      // :: $.shape == (num_zones + 4, 4)
     double *primitive,      // :: $.shape == (num_zones + 4, 4)
+    double *c2p_status,     // :: $.shape == (num_zones,)
     double scale_factor,    // :: $ >= 0.0
     int coords)             // :: $ in [0, 1]
 {
@@ -442,7 +440,11 @@ PUBLIC void srhd_1d_conserved_to_primitive(
         double xl = yl * scale_factor;
         double xr = yr * scale_factor;
         double dv = cell_volume(coords, xl, xr);
-        conserved_to_primitive(u, p, dv, xl);
+        int status = conserved_to_primitive(u, p, dv);
+
+        if (status) {
+            c2p_status[i] = status;
+        }
     }
 }
 
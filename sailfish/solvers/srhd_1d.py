@@ -21,6 +21,7 @@ from sailfish.kernel.system import get_array_module, execution_context, num_devi
 from sailfish.subdivide import subdivide, concat_on_host, lazy_reduce
 from sailfish.mesh import PlanarCartesianMesh, LogSphericalMesh
 from sailfish.solver_base import SolverBase
+from sailfish.solvers import SolverRuntimeError
 
 logger = getLogger(__name__)
 
@@ -40,6 +41,13 @@ BC_DICT = {
     "reflect": BC_REFLECT,
     "fixed": BC_FIXED,
 }
+
+C2P_ERRORS = {
+    1: "reached max iteration",  # C2P_MAX_ITERATION
+    2: "found non-positive total energy",  # C2P_NON_POSITIVE_ENERGY
+    3: "found non-positive or NaN pressure",  # C2P_NON_POSITIVE_PRESSURE
+}
+
 COORDINATES_DICT = {
     PlanarCartesianMesh: 0,
     LogSphericalMesh: 1,
@@ -129,6 +137,7 @@ class Patch:
 
             self.faces = faces
             self.wavespeeds = xp.zeros(num_zones)
+            self.c2p_status = xp.zeros(num_zones)
             self.primitive1 = xp.zeros_like(conserved_with_guard)
             self.conserved0 = conserved_with_guard.copy()
             self.conserved1 = conserved_with_guard.copy()
@@ -140,6 +149,7 @@ class Patch:
                 self.faces,
                 self.conserved1,
                 self.primitive1,
+                self.c2p_status,
                 self.scale_factor,
                 self.coordinates,
             )
@@ -175,6 +185,21 @@ class Patch:
             )
             return float(self.wavespeeds.max())
 
+    def check_c2p_status(self):
+        """
+        Raise an exception if the primitive recovery failed in any zone.
+
+        The kernel records a nonzero status code for failed zones, and leaves
+        the others alone, so the status array stays zero on successful steps.
+        """
+        if self.c2p_status.any():
+            i = int(self.xp.nonzero(self.c2p_status)[0][0])
+            x = float(self.faces[i]) * self.scale_factor
+            message = C2P_ERRORS[int(self.c2p_status[i])]
+            raise SolverRuntimeError(
+                f"srhd_1d_conserved_to_primitive {message} at position {x:.3f}"
+            )
+
     @property
     def scale_factor(self):
         return self.scale_factor_initial + self.scale_factor_derivative * self.time
@@ -267,7 +292,9 @@ class Solver(SolverBase):
 
     @property
     def primitive(self):
-        return concat_on_host([p.primitive for p in self.patches], self.num_guard)
+        primitive = concat_on_host([p.primitive for p in self.patches], self.num_guard)
+        self.check_c2p_status()
+        return primitive
 
     @property
     def time(self):
@@ -291,12 +318,14 @@ class Solver(SolverBase):
 
     def maximum_wavespeed(self):
         if self._options.compute_wavespeed:
-            return lazy_reduce(
+            a_max = lazy_reduce(
                 max,
                 float,
                 (patch.maximum_wavespeed for patch in self.patches),
                 (patch.execution_context for patch in self.patches),
             )
+            self.check_c2p_status()
+            return a_max
         else:
             return 1.0
 
@@ -311,6 +340,8 @@ class Solver(SolverBase):
         for b in bs:
             self.advance_rk(b, dt)
 
+        self.check_c2p_status()
+
     def advance_rk(self, rk_param, dt):
         for patch in self.patches:
             patch.recompute_primitive()
@@ -320,6 +351,14 @@ class Solver(SolverBase):
         for patch in self.patches:
             patch.advance_rk(rk_param, dt)
 
+    def check_c2p_status(self):
+        # The status arrays are only read back here, once all of the patch
+        # kernels have been launched, so that patches are not serialized by
+        # a device-to-host copy after each launch.
+        for patch in self.patches:
+            with patch.execution_context:
+                patch.check_c2p_status()
+
     def set_bc(self, array):
         ng = self.num_guard
         num_patches = len(self.patches)
@@ -104,7 +104,13 @@ PRIVATE void primitive_to_conserved(const double *prim, double *cons, double dv)
     // cons[4] = dv * m * prim[3];
 }
 
-PRIVATE void conserved_to_primitive(double *cons1, double *cons2, double *prim, double dv, double x, double q)
+// Status codes returned by conserved_to_primitive, and written to the status
+// array of the kernels that call it. Zero means success.
+#define C2P_MAX_ITERATION 1
+#define C2P_NON_POSITIVE_ENERGY 2
+#define C2P_NON_POSITIVE_PRESSURE 3
+
+PRIVATE int conserved_to_primitive(double *cons1, double *cons2, double *prim, double dv)
 {
     const double newton_iter_max = 500;
     const double error_tolerance = 1e-12 * (cons1[0] + cons1[3]) / dv;
@@ -114,13 +120,15 @@ PRIVATE void conserved_to_primitive(double *cons1, double *cons2, double *prim,
     const double s1              = cons1[1] / dv;
     const double s2              = cons1[2] / dv;
     const double ss              = s1 * s1 + s2 * s2;
+    const double tau_plus_m      = tau + m;
+    const double gm_minus_one    = gm - 1.0;
     int iteration                = 0;
     double p                     = prim[3];
     double w0;
     double f;
 
     while (1) {
-        const double et = tau + p + m;
+        const double et = tau_plus_m + p;
         const double b2 = min2(ss / et / et, 1.0 - 1e-10);
         const double w2 = 1.0 / (1.0 - b2);
         const double w  = sqrt(w2);
@@ -130,7 +138,7 @@ PRIVATE void conserved_to_primitive(double *cons1, double *cons2, double *prim,
         const double a2 = gm * p / (d * h);
         const double g  = b2 * a2 - 1.0;
 
-        f  = d * e * (gm - 1.0) - p;
+        f  = d * e * gm_minus_one - p;
         p -= f / g;
 
         if (fabs(f) < error_tolerance || iteration == newton_iter_max) {
@@ -140,9 +148,11 @@ PRIVATE void conserved_to_primitive(double *cons1, double *cons2, double *prim,
         iteration += 1;
     }
 
+    const double et = tau_plus_m + p;
+
     prim[0] = m / w0;
-    prim[1] = w0 * s1 / (tau + m + p);
-    prim[2] = w0 * s2 / (tau + m + p);
+    prim[1] = w0 * s1 / et;
+    prim[2] = w0 * s2 / et;
     prim[3] = p;
     // prim[4] = cons1[4] / cons1[0];
 
@@ -161,27 +171,16 @@ PRIVATE void conserved_to_primitive(double *cons1, double *cons2, double *prim,
         }
     }
 
-    #if (EXEC_MODE != EXEC_GPU)
     if (iteration == newton_iter_max) {
-        printf(
-            "[FATAL] srhd_2d_conserved_to_primitive reached max "
-            "iteration at comoving position (%.3f %.3f) "
-            "cons1 = [%.3e %.3e %.3e %.3e] error = %.3e\n", x, q, cons1[0], cons1[1], cons1[2], cons1[3], f);
-        exit(1);
+        return C2P_MAX_ITERATION;
     }
     if (cons1[3] <= 0.0) {
-        printf(
-            "[FATAL] srhd_2d_conserved_to_primitive found non-positive "
-            "or NaN total energy tau=%.5e at comoving position (%.3f %.3f)\n", cons1[3], x, q);
-        exit(1);
+        return C2P_NON_POSITIVE_ENERGY;
     }
     if (prim[3] <= 0.0 || prim[3] != prim[3]) {
-        printf(
-            "[FATAL] srhd_2d_conserved_to_primitive found non-positive "
-            "or NaN pressure p=%.5e at comoving position (%.3f %.3f)\n", prim[3], x, q);
-        exit(1);
+        return C2P_NON_POSITIVE_PRESSURE;
     }
-    #endif
+    return 0;
 }
 
 PRIVATE void primitive_to_flux(const double *prim, const double *cons, double *flux, int direction)
@@ -468,6 +467,32 @@ PRIVATE void geometric_source_terms(double r0, double r1, double q0, double q1,
 }
 
 
+// ============================ LAYOUT ========================================
+// ============================================================================
+/**
+ * Solution arrays are stored fields-first (struct-of-arrays), with shape
+ * (NCONS, ni, nj). Field q of the zone at flat offset n is found at
+ * a[q * sq + n], so that neighboring zones are adjacent in memory for each
+ * field. The kernels load a zone's fields into a local array before calling
+ * the device functions above, and store the results back the same way.
+ */
+PRIVATE void load_fields(const double *a, int sq, double *b)
+{
+    for (int q = 0; q < NCONS; ++q)
+    {
+        b[q] = a[q * sq];
+    }
+}
+
+PRIVATE void store_fields(const double *b, double *a, int sq)
+{
+    for (int q = 0; q < NCONS; ++q)
+    {
+        a[q * sq] = b[q];
+    }
+}
+
+
 // ============================ KERNELS =======================================
 // ============================================================================
 
@@ -482,20 +507,21 @@ PUBLIC void srhd_2d_primitive_to_conserved(
     int ni,
     int nj,
     double *face_positions,  // :: $.shape == (ni + 1,)
-    double *primitive,       // :: $.shape == (ni, nj, 4)
-    double *conserved,       // :: $.shape == (ni, nj, 4)
+    double *primitive,       // :: $.shape == (4, ni, nj)
+    double *conserved,       // :: $.shape == (4, ni, nj)
     double polar_extent,
     double scale_factor)     // :: $ >= 0.0
 {
-    int si = NCONS * nj;
-    int sj = NCONS;
+    int sq = ni * nj;
+    int si = nj;
+    int sj = 1;
     double dq = polar_extent / nj; // polar zone spacing
 
     FOR_EACH_2D(ni, nj)
     {
         int n = i * si + j * sj;
-        double *p = &primitive[n];
-        double *u = &conserved[n];
+        double p[NCONS];
+        double u[NCONS];
         double x0 = face_positions[i];
         double x1 = face_positions[i + 1];
         double r0 = x0 * scale_factor;
@@ -503,7 +529,9 @@ PUBLIC void srhd_2d_primitive_to_conserved(
         double q0 = dq * (j + 0);
         double q1 = dq * (j + 1);
         double dv = cell_volume(r0, r1, q0, q1);
+        load_fields(&primitive[n], sq, p);
         primitive_to_conserved(p, u, dv);
+        store_fields(u, &conserved[n], sq);
     }
 }
 
@@ -515,23 +543,25 @@ PUBLIC void srhd_2d_conserved_to_primitive(
     int ni,
     int nj,
     double *face_positions,  // :: $.shape == (ni + 1,)
-    double *conserved1,      // :: $.shape == (ni + 4, nj, 4)
-    double *conserved2,      // :: $.shape == (ni + 4, nj, 4)
-    double *primitive,       // :: $.shape == (ni + 4, nj, 4)
+    double *conserved1,      // :: $.shape == (4, ni + 4, nj)
+    double *conserved2,      // :: $.shape == (4, ni + 4, nj)
+    double *primitive,       // :: $.shape == (4, ni + 4, nj)
+    double *c2p_status,      // :: $.shape == (ni, nj)
     double polar_extent,
     double scale_factor)     // :: $ >= 0.0
 {
     int ng = 2; // number of guard zones in the radial direction
-    int si = NCONS * nj;
-    int sj = NCONS;
+    int sq = (ni + 2 * ng) * nj;
+    int si = nj;
+    int sj = 1;
     double dq = polar_extent / nj; // polar zone spacing
 
     FOR_EACH_2D(ni, nj)
     {
         int n = (i + ng) * si + j * sj;
-        double *p = &primitive[n];
-        double *u1 = &conserved1[n];
-        double *u2 = &conserved2[n];
+        double p[NCONS];
+        double u1[NCONS];
+        double u2[NCONS];
         double x0 = face_positions[i];
         double x1 = face_positions[i + 1];
         double r0 = x0 * scale_factor;
@@ -539,37 +569,72 @@ PUBLIC void srhd_2d_conserved_to_primitive(
         double q0 = dq * (j + 0);
         double q1 = dq * (j + 1);
         double dv = cell_volume(r0, r1, q0, q1);
-        conserved_to_primitive(u1, u2, p, dv, x0, q0);
+        load_fields(&conserved1[n], sq, u1);
+        load_fields(&primitive[n], sq, p);
+        int status = conserved_to_primitive(u1, u2, p, dv);
+        store_fields(u2, &conserved2[n], sq);
+        store_fields(p, &primitive[n], sq);
+
+        if (status) {
+            c2p_status[i * nj + j] = status;
+        }
     }
 }
 
 
 /**
- * Computes the maximum wavespeed in each zone.
+ * Converts an array of conserved data to an array of primitive data, and
+ * computes the maximum wavespeed in each zone. This does the work of
+ * srhd_2d_conserved_to_primitive and the wavespeed calculation in a single
+ * pass over the arrays.
  */
 PUBLIC void srhd_2d_max_wavespeeds(
     int ni,
     int nj,
     double *face_positions,  // :: $.shape == (ni + 1,)
-    double *primitive,       // :: $.shape == (ni + 4, nj, 4)
+    double *conserved1,      // :: $.shape == (4, ni + 4, nj)
+    double *conserved2,      // :: $.shape == (4, ni + 4, nj)
+    double *primitive,       // :: $.shape == (4, ni + 4, nj)
+    double *c2p_status,      // :: $.shape == (ni, nj)
     double *wavespeed,       // :: $.shape == (ni, nj)
+    double polar_extent,
+    double scale_factor,     // :: $ >= 0.0
     double adot)             // :: $ >= 0.0
 {
     int ng = 2; // number of guard zones in the radial direction
-    int si = NCONS * nj;
-    int sj = NCONS;
+    int sq = (ni + 2 * ng) * nj;
+    int si = nj;
+    int sj = 1;
     int ti = nj;
     int tj = 1;
+    double dq = polar_extent / nj; // polar zone spacing
 
     FOR_EACH_2D(ni, nj)
     {
-        double *p = &primitive[(i + ng) * si + j * sj];
+        int n = (i + ng) * si + j * sj;
         double *a = &wavespeed[(i +  0) * ti + j * tj];
         double x0 = face_positions[i];
         double x1 = face_positions[i + 1];
+        double r0 = x0 * scale_factor;
+        double r1 = x1 * scale_factor;
+        double q0 = dq * (j + 0);
+        double q1 = dq * (j + 1);
+        double dv = cell_volume(r0, r1, q0, q1);
+        double u1[NCONS];
+        double u2[NCONS];
+        double p[NCONS];
         double p_boosted[NCONS];
         double ai[2];
         double aj[2];
+        load_fields(&conserved1[n], sq, u1);
+        load_fields(&primitive[n], sq, p);
+        int status = conserved_to_primitive(u1, u2, p, dv);
+        store_fields(u2, &conserved2[n], sq);
+        store_fields(p, &primitive[n], sq);
+
+        if (status) {
+            c2p_status[i * nj + j] = status;
+        }
         primitive_with_radial_boost(p, p_boosted, 0.5 * (x0 + x1) * adot);
         primitive_to_outer_wavespeeds(p_boosted, ai, 1);
         primitive_to_outer_wavespeeds(p_boosted, aj, 2);
@@ -581,15 +646,23 @@ PUBLIC void srhd_2d_max_wavespeeds(
 /**
  * Updates an array of primitive data by advancing it a single Runge-Kutta
  * step.
+ *
+ * If recompute_primitive is nonzero, the updated conserved data in each zone
+ * is also converted to primitive data (written to primitive_wr, which must
+ * not alias primitive_rd), as srhd_2d_conserved_to_primitive would do at the
+ * start of the next Runge-Kutta stage. The scale factor at the end of the
+ * stage is needed for the zone volumes.
  */
 PUBLIC void srhd_2d_advance_rk(
     int ni,
     int nj,
     double *face_positions, // :: $.shape == (ni + 1,)
-    double *conserved_rk,   // :: $.shape == (ni + 4, nj, 4)
-    double *primitive_rd,   // :: $.shape == (ni + 4, nj, 4)
-    double *conserved_rd,   // :: $.shape == (ni + 4, nj, 4)
-    double *conserved_wr,   // :: $.shape == (ni + 4, nj, 4)
+    double *conserved_rk,   // :: $.shape == (4, ni + 4, nj)
+    double *primitive_rd,   // :: $.shape == (4, ni + 4, nj)
+    double *conserved_rd,   // :: $.shape == (4, ni + 4, nj)
+    double *conserved_wr,   // :: $.shape == (4, ni + 4, nj)
+    double *primitive_wr,   // :: $.shape == (4, ni + 4, nj)
+    double *c2p_status,     // :: $.shape == (ni, nj)
     double polar_extent,
     double a0,              // scale factor at t=0
     double adot,            // scale factor derivative
@@ -600,14 +673,17 @@ PUBLIC void srhd_2d_advance_rk(
     double jet_gamma_beta,
     double jet_theta,
     double jet_duration,
-    int num_first_order_zones)
+    int num_first_order_zones,
+    double scale_factor_wr,  // scale factor at the end of the stage
+    int recompute_primitive)
 {
     int ng = 2; // number of guard zones in the radial direction
-    int si = NCONS * nj;
-    int sj = NCONS;
+    int sq = (ni + 2 * ng) * nj;
+    int si = nj;
+    int sj = 1;
     double dq = polar_extent / nj; // polar zone spacing
 
-    FOR_EACH_2D(ni, nj)
+    FOR_EACH_2D_TILED(ni, nj)
     {
         double x0 = face_positions[i];
         double x1 = face_positions[i + 1];
@@ -624,8 +700,10 @@ PUBLIC void srhd_2d_advance_rk(
             double jet_rho = jet_mdot / (4.0 * PI * r0 * r0 * jet_u);
             double jet_prof = exp(-pow(qc / jet_theta, 2.0));
             double prim[NCONS] = {jet_rho, jet_u * jet_prof, 0.0, 1e-6 * jet_rho};
+            double cons[NCONS];
             double dv = cell_volume(r0, r1, q0, q1);
-            primitive_to_conserved(prim, uwr, dv);
+            primitive_to_conserved(prim, cons, dv);
+            store_fields(cons, uwr, sq);
         }
         else if (jet_mdot > 0.0 && i == 0) // if the jet is enabled, then fix the innermost zone
         {
@@ -633,18 +711,28 @@ PUBLIC void srhd_2d_advance_rk(
         }
         else
         {
-            double *urk = &conserved_rk[(i + 0 + ng) * si + (j + 0) * sj];
-            double *urd = &conserved_rd[(i + 0 + ng) * si + (j + 0) * sj];
             double *uwr = &conserved_wr[(i + 0 + ng) * si + (j + 0) * sj];
-            double *pcc = &primitive_rd[(i + 0 + ng) * si + (j + 0) * sj];
-            double *pli = &primitive_rd[(i - 1 + ng) * si + (j + 0) * sj];
-            double *pri = &primitive_rd[(i + 1 + ng) * si + (j + 0) * sj];
-            double *pki = &primitive_rd[(i - 2 + ng) * si + (j + 0) * sj];
-            double *pti = &primitive_rd[(i + 2 + ng) * si + (j + 0) * sj];
-            double *plj = &primitive_rd[(i + 0 + ng) * si + max2(j - 1, 0) * sj];
-            double *prj = &primitive_rd[(i + 0 + ng) * si + min2(j + 1, nj - 1) * sj];
-            double *pkj = &primitive_rd[(i + 0 + ng) * si + max2(j - 2, 0) * sj];
-            double *ptj = &primitive_rd[(i + 0 + ng) * si + min2(j + 2, nj - 1) * sj];
+            double urd[NCONS];
+            double pcc[NCONS];
+            double pli[NCONS];
+            double pri[NCONS];
+            double pki[NCONS];
+            double pti[NCONS];
+            double plj[NCONS];
+            double prj[NCONS];
+            double pkj[NCONS];
+            double ptj[NCONS];
+            double uw[NCONS];
+            load_fields(&conserved_rd[(i + 0 + ng) * si + (j + 0) * sj], sq, urd);
+            load_fields(&primitive_rd[(i + 0 + ng) * si + (j + 0) * sj], sq, pcc);
+            load_fields(&primitive_rd[(i - 1 + ng) * si + (j + 0) * sj], sq, pli);
+            load_fields(&primitive_rd[(i + 1 + ng) * si + (j + 0) * sj], sq, pri);
+            load_fields(&primitive_rd[(i - 2 + ng) * si + (j + 0) * sj], sq, pki);
+            load_fields(&primitive_rd[(i + 2 + ng) * si + (j + 0) * sj], sq, pti);
+            load_fields(&primitive_rd[(i + 0 + ng) * si + max2(j - 1, 0) * sj], sq, plj);
+            load_fields(&primitive_rd[(i + 0 + ng) * si + min2(j + 1, nj - 1) * sj], sq, prj);
+            load_fields(&primitive_rd[(i + 0 + ng) * si + max2(j - 2, 0) * sj], sq, pkj);
+            load_fields(&primitive_rd[(i + 0 + ng) * si + min2(j + 2, nj - 1) * sj], sq, ptj);
 
             double plip[NCONS];
             double plim[NCONS];
@@ -701,11 +789,42 @@ PUBLIC void srhd_2d_advance_rk(
 
             for (int q = 0; q < NCONS; ++q)
             {
-                uwr[q] = urd[q] + (
+                uw[q] = urd[q] + (
                     fli[q] * da_r0 - fri[q] * da_r1 +
                     flj[q] * da_q0 - frj[q] * da_q1 + sources[q]
                 ) * dt;
-                uwr[q] = (1.0 - rk_param) * uwr[q] + rk_param * urk[q];
+            }
+
+            // The first Runge-Kutta stage has rk_param == 0, and does not
+            // read conserved_rk; it is not filled in for single-stage steps.
+            if (rk_param != 0.0)
+            {
+                double urk[NCONS];
+                load_fields(&conserved_rk[(i + 0 + ng) * si + (j + 0) * sj], sq, urk);
+
+                for (int q = 0; q < NCONS; ++q)
+                {
+                    uw[q] = (1.0 - rk_param) * uw[q] + rk_param * urk[q];
+                }
+            }
+            store_fields(uw, uwr, sq);
+        }
+
+        if (recompute_primitive)
+        {
+            int n = (i + ng) * si + j * sj;
+            double u1[NCONS];
+            double u2[NCONS];
+            double p[NCONS];
+            double dv = cell_volume(x0 * scale_factor_wr, x1 * scale_factor_wr, q0, q1);
+            load_fields(&conserved_wr[n], sq, u1);
+            load_fields(&primitive_rd[n], sq, p);
+            int status = conserved_to_primitive(u1, u2, p, dv);
+            store_fields(u2, &conserved_wr[n], sq);
+            store_fields(p, &primitive_wr[n], sq);
+
+            if (status) {
+                c2p_status[i * nj + j] = status;
             }
         }
     }
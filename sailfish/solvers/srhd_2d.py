@@ -12,6 +12,11 @@ The solver configuration is:
 The Python code assumes RK2 time stepping, although coefficients are written
 below for RK1 and low-storage RK3 as well. The C code hard-codes a PLM theta
 value of 2.0.
+
+Solution arrays on each patch are stored fields-first, with shape (4, ni, nj),
+so that the kernels read neighboring zones of a given field with unit stride.
+The solution and primitive properties return fields-last views, matching the
+layout of the other solvers and of checkpoint files.
 """
 
 from logging import getLogger
@@ -21,6 +26,7 @@ from sailfish.kernel.system import get_array_module, execution_context, num_devi
 from sailfish.subdivide import subdivide, concat_on_host, lazy_reduce
 from sailfish.mesh import PlanarCartesianMesh, LogSphericalMesh
 from sailfish.solver_base import SolverBase
+from sailfish.solvers import SolverRuntimeError
 
 logger = getLogger(__name__)
 
@@ -45,18 +51,30 @@ BC_DICT = {
     "jet": BC_JET,
 }
 
+C2P_ERRORS = {
+    1: "reached max iteration",  # C2P_MAX_ITERATION
+    2: "found non-positive total energy",  # C2P_NON_POSITIVE_ENERGY
+    3: "found non-positive or NaN pressure",  # C2P_NON_POSITIVE_PRESSURE
+}
+
 
 def initial_condition(setup, mesh, i0, i1, j0, j1, time, xp):
-    primitive = xp.zeros([i1 - i0, j1 - j0, NUM_CONS])
+    import numpy as np
+
+    primitive = np.zeros([i1 - i0, j1 - j0, NUM_CONS])
 
-    r_list = [mesh.cell_coordinates(time, i, 0)[0] for i in range(i0, i1)]
-    q_list = [mesh.cell_coordinates(time, 0, j)[1] for j in range(j0, j1)]
+    try:
+        coordinates = mesh.cell_coordinates_grid(time, i0, i1, j0, j1)
+        setup.primitive_vec(time, coordinates, primitive)
+    except NotImplementedError:
+        r_list = [mesh.cell_coordinates(time, i, 0)[0] for i in range(i0, i1)]
+        q_list = [mesh.cell_coordinates(time, 0, j)[1] for j in range(j0, j1)]
 
-    for i, r in enumerate(r_list):
-        for j, q in enumerate(q_list):
-            setup.primitive(time, (r, q), primitive[i, j])
+        for i, r in enumerate(r_list):
+            for j, q in enumerate(q_list):
+                setup.primitive(time, (r, q), primitive[i, j])
 
-    return primitive
+    return xp.array(primitive)
 
 
 class Options(NamedTuple):
@@ -118,10 +136,11 @@ class Patch:
 
         with self.execution_context:
             faces = xp.array(mesh.faces(*index_range))
-            conserved_with_guard = xp.zeros([shape[0] + 2 * ng, nj, nq])
+            conserved_with_guard = xp.zeros([nq, shape[0] + 2 * ng, nj])
 
             if conserved is None:
                 primitive = initial_condition(setup, mesh, i0, i1, 0, nj, time, xp)
+                primitive = xp.ascontiguousarray(xp.moveaxis(primitive, -1, 0))
                 conserved = xp.zeros_like(primitive)
 
                 lib.srhd_2d_primitive_to_conserved[shape](
@@ -131,16 +150,19 @@ class Patch:
                     mesh.polar_extent,
                     mesh.scale_factor(time),
                 )
-                conserved_with_guard[ng:-ng] = conserved
+                conserved_with_guard[:, ng:-ng] = conserved
             else:
-                conserved_with_guard[ng:-ng] = xp.array(conserved)
+                conserved_with_guard[:, ng:-ng] = xp.moveaxis(xp.array(conserved), -1, 0)
 
             self.faces = faces
             self.wavespeeds = xp.zeros(shape)
+            self.wavespeeds_max = xp.zeros(())
+            self.c2p_status = xp.zeros(shape)
             self.primitive1 = xp.zeros_like(conserved_with_guard)
-            self.conserved0 = conserved_with_guard.copy()
-            self.conserved1 = conserved_with_guard.copy()
-            self.conserved2 = conserved_with_guard.copy()
+            self.primitive2 = xp.zeros_like(conserved_with_guard)
+            self.conserved0 = xp.empty_like(conserved_with_guard)
+            self.conserved1 = conserved_with_guard
+            self.conserved2 = xp.empty_like(conserved_with_guard)
 
     def recompute_primitive(self):
         with self.execution_context:
@@ -149,12 +171,16 @@ class Patch:
                 self.conserved1,
                 self.conserved2,
                 self.primitive1,
+                self.c2p_status,
                 self.polar_extent,
                 self.scale_factor,
             )
             self.conserved1, self.conserved2 = self.conserved2, self.conserved1
 
-    def advance_rk(self, rk_param, dt):
+    def advance_rk(self, rk_param, dt, recompute_primitive=False):
+        time = self.time0 * rk_param + (self.time + dt) * (1.0 - rk_param)
+        scale_factor = self.scale_factor_initial + self.scale_factor_derivative * time
+
         with self.execution_context:
             self.lib.srhd_2d_advance_rk[self.shape](
                 self.faces,
@@ -162,6 +188,8 @@ class Patch:
                 self.primitive1,
                 self.conserved1,
                 self.conserved2,
+                self.primitive2,
+                self.c2p_status,
                 self.polar_extent,
                 self.scale_factor_initial,
                 self.scale_factor_derivative,
@@ -173,37 +201,66 @@ class Patch:
                 self.physics.jet_theta,
                 self.physics.jet_duration,
                 self.num_first_order_zones,
+                scale_factor,
+                int(recompute_primitive),
             )
-        self.time = self.time0 * rk_param + (self.time + dt) * (1.0 - rk_param)
+        self.time = time
         self.conserved1, self.conserved2 = self.conserved2, self.conserved1
 
+        if recompute_primitive:
+            self.primitive1, self.primitive2 = self.primitive2, self.primitive1
+
     def maximum_wavespeed(self):
-        self.recompute_primitive()
         with self.execution_context:
             self.lib.srhd_2d_max_wavespeeds[self.shape](
                 self.faces,
+                self.conserved1,
+                self.conserved2,
                 self.primitive1,
+                self.c2p_status,
                 self.wavespeeds,
+                self.polar_extent,
+                self.scale_factor,
                 self.scale_factor_derivative,
             )
-            return float(self.wavespeeds.max())
+            self.conserved1, self.conserved2 = self.conserved2, self.conserved1
+            return float(self.xp.max(self.wavespeeds, out=self.wavespeeds_max))
+
+    def check_c2p_status(self):
+        """
+        Raise an exception if the primitive recovery failed in any zone.
+
+        The kernels record a nonzero status code for failed zones, and leave
+        the others alone, so the status array stays zero on successful steps.
+        """
+        if self.c2p_status.any():
+            i, j = (int(n[0]) for n in self.xp.nonzero(self.c2p_status))
+            x = float(self.faces[i])
+            q = self.polar_extent * j / self.shape[1]
+            message = C2P_ERRORS[int(self.c2p_status[i, j])]
+            raise SolverRuntimeError(
+                f"srhd_2d_conserved_to_primitive {message} "
+                f"at comoving position ({x:.3f} {q:.3f})"
+            )
 
     @property
     def scale_factor(self):
         return self.scale_factor_initial + self.scale_factor_derivative * self.time
 
-    def new_iteration(self):
+    def new_iteration(self, copy_conserved=True):
         self.time0 = self.time
-        self.conserved0[...] = self.conserved1[...]
+
+        if copy_conserved:
+            self.conserved0[...] = self.conserved1[...]
 
     @property
     def conserved(self):
-        return self.conserved1
+        return self.xp.moveaxis(self.conserved1, 0, -1)
 
     @property
     def primitive(self):
         self.recompute_primitive()
-        return self.primitive1
+        return self.xp.moveaxis(self.primitive1, 0, -1)
 
 
 class Solver(SolverBase):
@@ -292,7 +349,11 @@ class Solver(SolverBase):
 
     @property
     def primitive(self):
-        return concat_on_host([p.primitive for p in self.patches], (self.num_guard, 0))
+        primitive = concat_on_host(
+            [p.primitive for p in self.patches], (self.num_guard, 0)
+        )
+        self.check_c2p_status()
+        return primitive
 
     @property
     def time(self):
@@ -321,12 +382,14 @@ class Solver(SolverBase):
 
     def maximum_wavespeed(self):
         if self._options.compute_wavespeed:
-            return lazy_reduce(
+            a_max = lazy_reduce(
                 max,
                 float,
                 (patch.maximum_wavespeed for patch in self.patches),
                 (patch.execution_context for patch in self.patches),
             )
+            self.check_c2p_status()
+            return a_max
         else:
             return 1.0
 
@@ -338,17 +401,29 @@ class Solver(SolverBase):
 
         self.new_iteration()
 
-        for b in bs:
-            self.advance_rk(b, dt)
-
-    def advance_rk(self, rk_param, dt):
         for patch in self.patches:
             patch.recompute_primitive()
 
+        # Each stage but the last recovers the primitives for the next stage
+        # in the same kernel launch that updates the conserved data.
+        for n, b in enumerate(bs):
+            self.advance_rk(b, dt, recompute_primitive=n < len(bs) - 1)
+
+        self.check_c2p_status()
+
+    def advance_rk(self, rk_param, dt, recompute_primitive=False):
         self.set_bc("primitive1")
 
         for patch in self.patches:
-            patch.advance_rk(rk_param, dt)
+            patch.advance_rk(rk_param, dt, recompute_primitive)
+
+    def check_c2p_status(self):
+        # The status arrays are only read back here, once all of the patch
+        # kernels have been launched, so that patches are not serialized by
+        # a device-to-host copy after each launch.
+        for patch in self.patches:
+            with patch.execution_context:
+                patch.check_c2p_status()
 
     def set_bc(self, array):
         ng = self.num_guard
@@ -356,9 +431,9 @@ class Solver(SolverBase):
         for ic in range(num_patches):
             il = (ic + num_patches - 1) % num_patches
             ir = (ic + num_patches + 1) % num_patches
-            pl = getattr(self.patches[il], array)
-            pc = getattr(self.patches[ic], array)
-            pr = getattr(self.patches[ir], array)
+            pl = self.xp.moveaxis(getattr(self.patches[il], array), 0, -1)
+            pc = self.xp.moveaxis(getattr(self.patches[ic], array), 0, -1)
+            pr = self.xp.moveaxis(getattr(self.patches[ir], array), 0, -1)
             self.set_bc_patch(pl, pc, pr, ic)
 
     def set_bc_patch(self, pl, pc, pr, patch_index):
@@ -403,5 +478,9 @@ class Solver(SolverBase):
                         pc[-1, j] = negative_vel(pc[-4, j])
 
     def new_iteration(self):
+        # The conserved data at the start of the step is only read by the
+        # later stages of RK2 and RK3, so a single-stage step skips the copy.
+        copy_conserved = self._options.rk_order > 1
+
         for patch in self.patches:
-            patch.new_iteration()
+            patch.new_iteration(copy_conserved)